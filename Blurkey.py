@@ -2,117 +2,529 @@
 Blurkey.py
 ----------
 Keyword / address detection + blur/replace utilities.
-Requires: opencv-python, pytesseract, pdf2image, pillow.
+Requires: opencv-python, pytesseract, pdf2image, pillow
+(optional: tesserocr for a persistent in-process Tesseract engine).
+OCR results can be cached on disk across runs (see ocr_cache.py).
 """
 
-import cv2, pytesseract, numpy as np
-from pdf2image import convert_from_path
-from typing import List, Optional
+import cv2, numpy as np
+from pdf2image import convert_from_path, pdfinfo_from_path
+import threading
+from collections import deque
+from dataclasses import replace
+from concurrent.futures import ProcessPoolExecutor
+from ocr_cache import OcrCache, cache_key
+from ocr_backends import backend_name, get_backend
+from ocr_prep import OcrConfig, prepare, scale_boxes
+from text_layer import pdf_words
+from tiling import image_header, ocr_tiled
+from metrics import (JobMetrics, PageMetrics, timed,
+                     start_memory_tracking, memory_peak)
+from output_sinks import (OutputEncoding, ImageDirSink, PdfSink, TiffSink,
+                          output_path)
+from masking import mask_boxes, MASK_MODES
+from keyword_matcher import KeywordMatcher, as_matcher, normalize_tokens
+from typing import Callable, Iterator, List, Optional, Tuple, Union
+
+PDF_DPI = 300
+TIFF_EXTS  = (".tif", ".tiff")                    # may hold many frames (faxes)
+IMAGE_EXTS = (".jpg", ".jpeg", ".png") + TIFF_EXTS
+SUPPORTED_EXTS = IMAGE_EXTS + (".pdf",)
 
 # ------------------------------------------------------------------ #
-# 1. Load pages (PDF -> list of cv2 images)                           #
+# 1. Load pages (lazy page source -> cv2 images)                      #
 # ------------------------------------------------------------------ #
-def load_pages(file_path: str):
+def page_count(file_path: str) -> int:
     ext = file_path.lower()
-    if ext.endswith((".jpg", ".jpeg", ".png", ".tif", ".tiff")):
-        return [cv2.imread(file_path)]
+    if ext.endswith(TIFF_EXTS):
+        return max(1, cv2.imcount(file_path))     # reads the frame directories only
+    if ext.endswith(IMAGE_EXTS):
+        return 1
     if ext.endswith(".pdf"):
-        pages = convert_from_path(file_path, dpi=300)
-        return [cv2.cvtColor(np.array(p), cv2.COLOR_RGB2BGR) for p in pages]
+        return int(pdfinfo_from_path(file_path)["Pages"])
     raise ValueError("Unsupported file type")
 
+def _page_ranges(pages: List[int], chunk: int) -> Iterator[Tuple[int, int]]:
+    """Group sorted page numbers into consecutive runs of at most `chunk`."""
+    start = prev = None
+    for p in pages:
+        if start is not None and p == prev + 1 and p - start < chunk:
+            prev = p; continue
+        if start is not None:
+            yield start, prev
+        start = prev = p
+    if start is not None:
+        yield start, prev
+
+def wanted_pages(file_path: str, page_numbers: Optional[List[int]] = None) -> List[int]:
+    """Sorted, de-duplicated, in-range page numbers (None = all pages)."""
+    total = page_count(file_path)
+    if page_numbers is None:
+        page_numbers = range(1, total+1)
+    return sorted({p for p in page_numbers if 1 <= p <= total})
+
+def iter_pages(file_path: str, page_numbers: Optional[List[int]] = None, *,
+               dpi: int = PDF_DPI, chunk: int = 1) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Yield (page_no, BGR image) for the requested pages only (1-based,
+    None = all).  PDFs are rasterised `chunk` consecutive pages at a time
+    via first_page/last_page, so peak memory is one chunk, not the document;
+    multi-page TIFFs are read the same way, `chunk` frames per imreadmulti.
+    """
+    wanted = wanted_pages(file_path, page_numbers)
+    ext = file_path.lower()
+
+    if ext.endswith(TIFF_EXTS) and page_count(file_path) > 1:
+        for first, last in _page_ranges(wanted, max(1, chunk)):
+            ok, frames = cv2.imreadmulti(file_path, start=first - 1,
+                                         count=last - first + 1, flags=cv2.IMREAD_COLOR)
+            if not ok:
+                raise ValueError(f"Cannot read frames {first}-{last} of {file_path}")
+            for page_no, frame in enumerate(frames, first):
+                yield page_no, frame
+            del frames
+        return
+
+    if not ext.endswith(".pdf"):
+        if wanted:
+            yield 1, cv2.imread(file_path)
+        return
+
+    for first, last in _page_ranges(wanted, max(1, chunk)):
+        pages = convert_from_path(file_path, dpi=dpi,
+                                  first_page=first, last_page=last)
+        for page_no, p in enumerate(pages, first):
+            yield page_no, cv2.cvtColor(np.array(p), cv2.COLOR_RGB2BGR)
+        del pages
+
+def source_resolution(file_path: str, dpi: int = PDF_DPI) -> Optional[Tuple[float, float]]:
+    """
+    (x, y) resolution the pages of `file_path` come out at: `dpi` for PDFs
+    (they are rendered at it), the file's own DPI tag for images (the first
+    frame's, for multi-page TIFFs), else None.
+    """
+    if file_path.lower().endswith(".pdf"):
+        return dpi, dpi
+    head = image_header(file_path)
+    tag = head[2].get("dpi") if head else None
+    if not tag or min(float(v) for v in tag[:2]) <= 1:
+        return None
+    return float(tag[0]), float(tag[1])
+
+def source_dpi(file_path: str, dpi: int = PDF_DPI) -> Optional[int]:
+    """Horizontal resolution of `file_path`'s pages (see source_resolution)."""
+    res = source_resolution(file_path, dpi)
+    return round(res[0]) if res else None
+
+def load_pages(file_path: str):
+    return [img for _, img in iter_pages(file_path)]
+
 # ------------------------------------------------------------------ #
 # 2. Internal helper – mask ROI                                      #
 # ------------------------------------------------------------------ #
 def _mask_roi(img, x1, y1, x2, y2, *, mode="blur"):
-    if mode == "blur":
-        roi = cv2.GaussianBlur(img[y1:y2, x1:x2], (45,45), 0)
-        img[y1:y2, x1:x2] = roi
-    else:  # replace
-        cv2.rectangle(img, (x1,y1), (x2,y2), (255,255,255), -1)
-        cv2.putText(img, "MASKED", (x1, y1+25),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0,0,0), 2)
+    """Single-box convenience wrapper; detectors batch through mask_boxes."""
+    mask_boxes(img, [(x1, y1, x2, y2)], mode=mode, merge=False)
+
+# ------------------------------------------------------------------ #
+# 2b. OCR (optionally served from the on-disk cache)                 #
+# ------------------------------------------------------------------ #
+def _ocr_cache_key(src, ocr: OcrConfig) -> str:
+    """Cache key for an already-prepared OCR image."""
+    return cache_key(src, f"{backend_name(ocr.backend)}|{ocr.key()}")
+
+def _ocr_data(img, cache: Optional[OcrCache] = None,
+              ocr: Optional[OcrConfig] = None):
+    """
+    image_to_data on the (optionally reduced) OCR copy, boxes in page coords.
+    Pages larger than ocr.tile_size are OCRed as overlapping tiles in
+    parallel (each tile cached on its own) and stitched back together.
+    """
+    ocr = ocr or OcrConfig()
+    if ocr.tiled(img):
+        tile_ocr = ocr.untiled
+        return ocr_tiled(img, lambda t: _ocr_data(t, cache, tile_ocr),
+                         ocr.tile_size, ocr.tile_overlap, ocr.tile_workers)
+    src, scale = prepare(img, ocr)
+    key = None
+    if cache is not None:
+        key  = _ocr_cache_key(src, ocr)
+        data = cache.get(key)
+        if data is not None:
+            return scale_boxes(data, scale)
+    data = get_backend(ocr.backend).image_to_data(src, ocr.lang, ocr.tesseract_config)
+    if cache is not None:
+        cache.put(key, data)
+    return scale_boxes(data, scale)
+
+def _count(pm, tokens, matches, masked):
+    if pm is not None:
+        pm.tokens    += sum(1 for t in tokens if t.strip())
+        pm.matches   += matches
+        pm.masked_px += sum((x2-x1) * (y2-y1) for x1, y1, x2, y2 in masked)
 
 # ------------------------------------------------------------------ #
 # 3. Keyword blur                                                    #
 # ------------------------------------------------------------------ #
-def detect_and_blur_entities(img, keywords: List[str], *, mode="blur"):
-    data = pytesseract.image_to_data(img, output_type=pytesseract.Output.DICT)
-    n = len(data["text"])
-    keys = [k.lower().split() for k in keywords]
-
-    i = 0
-    while i < n:
-        if not data["text"][i].strip():
-            i += 1; continue
-        matched = None
-        for kw in keys:
-            L = len(kw)
-            if i+L <= n and kw == [data["text"][i+j].strip().lower() for j in range(L)]:
-                matched = L; break
-        if not matched:
-            i += 1; continue
-
-        box_x1 = min(data['left'][i+j] for j in range(matched))
-        box_y1 = min(data['top'][i+j]  for j in range(matched))
-        box_x2 = max(data['left'][i+j]+data['width'][i+j] for j in range(matched))
-        box_y2 = max(data['top'][i+j] +data['height'][i+j] for j in range(matched))
-        _mask_roi(img, box_x1, box_y1, box_x2, box_y2, mode=mode)
-        i += matched
+def detect_and_blur_entities(img, keywords: Union[KeywordMatcher, List[str]], *,
+                             mode="blur", ocr_cache: Optional[OcrCache] = None,
+                             ocr: Optional[OcrConfig] = None,
+                             data: Optional[dict] = None,
+                             metrics: Optional[PageMetrics] = None):
+    """`data`: precomputed word boxes (image_to_data shape) - skips OCR."""
+    if data is None:
+        with timed(metrics, "ocr"):
+            data = _ocr_data(img, ocr_cache, ocr)
+    with timed(metrics, "match"):
+        matcher = as_matcher(keywords)    # pass a KeywordMatcher to reuse it
+        tokens  = normalize_tokens(data["text"])
+
+        boxes = []
+        for i, j in matcher.find(tokens):
+            box_x1 = min(data['left'][i:j])
+            box_y1 = min(data['top'][i:j])
+            box_x2 = max(x+w for x,w in zip(data['left'][i:j], data['width'][i:j]))
+            box_y2 = max(y+h for y,h in zip(data['top'][i:j],  data['height'][i:j]))
+            boxes.append((box_x1, box_y1, box_x2, box_y2))
+    with timed(metrics, "mask"):
+        masked = mask_boxes(img, boxes, mode=mode)
+    _count(metrics, tokens, len(boxes), masked)
     return img
 
 # ------------------------------------------------------------------ #
 # 4. Address blur (keyword + N lines below)                           #
 # ------------------------------------------------------------------ #
+def _line_index(data):
+    """
+    Index OCR words by physical line.  Tesseract restarts line_num in every
+    block/paragraph, so lines are keyed by (block_num, par_num, line_num)
+    and ranked top-to-bottom.  Returns (word_idx, word_rank, line_boxes):
+    the word rows used, each word's line rank, and per-rank line bboxes
+    as an (L, 4) array of x1, y1, x2, y2.
+    """
+    text = np.array([t.strip() for t in data["text"]], dtype=object)
+    keep = text != ""
+    if "level" in data:
+        keep &= np.asarray(data["level"]) == 5
+    word_idx = np.flatnonzero(keep)
+    if word_idx.size == 0:
+        return word_idx, word_idx, np.empty((0, 4), dtype=np.int64)
+
+    col  = lambda k: np.asarray(data[k], dtype=np.int64)[word_idx]
+    x1, y1 = col("left"), col("top")
+    x2, y2 = x1 + col("width"), y1 + col("height")
+    keys = np.stack([col("block_num"), col("par_num"), col("line_num")], axis=1)
+    _, line_of = np.unique(keys, axis=0, return_inverse=True)
+    line_of = line_of.ravel()
+    L = line_of.max() + 1
+
+    boxes = np.empty((L, 4), dtype=np.int64)
+    boxes[:, :2] = np.iinfo(np.int64).max; boxes[:, 2:] = np.iinfo(np.int64).min
+    np.minimum.at(boxes[:, 0], line_of, x1); np.minimum.at(boxes[:, 1], line_of, y1)
+    np.maximum.at(boxes[:, 2], line_of, x2); np.maximum.at(boxes[:, 3], line_of, y2)
+
+    order = np.lexsort((boxes[:, 0], boxes[:, 1]))     # by top, then left
+    rank  = np.empty(L, dtype=np.int64); rank[order] = np.arange(L)
+    return word_idx, rank[line_of], boxes[order]
+
 def detect_and_blur_address_entities(img, keywords: List[str], *,
-                                     mode="blur", lines_below=4):
-    data = pytesseract.image_to_data(img, output_type=pytesseract.Output.DICT)
-    n       = len(data["text"])
-    key_lc  = [k.lower() for k in keywords]
-
-    # build line map
-    line_to_indices = {}
-    for idx in range(n):
-        line_to_indices.setdefault(data['line_num'][idx], []).append(idx)
-    sorted_lines = sorted(line_to_indices)
-
-    for idx in range(n):
-        if data["text"][idx].strip().lower() in key_lc:
-            base_line = data['line_num'][idx]
-            base_idx  = sorted_lines.index(base_line)
-            target_lines = sorted_lines[base_idx: base_idx+lines_below+1]
-
-            xs = [data['left'][j] for ln in target_lines for j in line_to_indices[ln]]
-            ys = [data['top'][j]  for ln in target_lines for j in line_to_indices[ln]]
-            ws = [data['width'][j] for ln in target_lines for j in line_to_indices[ln]]
-            hs = [data['height'][j] for ln in target_lines for j in line_to_indices[ln]]
-
-            x1, y1 = max(min(xs)-10,0), max(min(ys)-5,0)
-            x2, y2 = min(max([x+w for x,w in zip(xs,ws)])+10, img.shape[1]), \
-                     min(max([y+h for y,h in zip(ys,hs)])+5,  img.shape[0])
-            _mask_roi(img, x1, y1, x2, y2, mode=mode)
-            break
+                                     mode="blur", lines_below=4,
+                                     ocr_cache: Optional[OcrCache] = None,
+                                     ocr: Optional[OcrConfig] = None,
+                                     data: Optional[dict] = None,
+                                     metrics: Optional[PageMetrics] = None):
+    if data is None:
+        with timed(metrics, "ocr"):
+            data = _ocr_data(img, ocr_cache, ocr)
+    with timed(metrics, "match"):
+        key_lc = {k.strip().lower() for k in keywords}
+        word_idx, word_rank, line_boxes = _line_index(data)
+        h, w   = img.shape[:2]
+
+        boxes = []
+        hit_ranks = sorted({int(r) for i, r in zip(word_idx, word_rank)
+                            if data["text"][i].strip().lower() in key_lc})
+        idx = np.arange(len(line_boxes))
+        in_col = lambda x1, x2: (line_boxes[:, 0] < x2) & (line_boxes[:, 2] > x1)
+        for r in hit_ranks:                   # every hit, not just the first
+            # "below" = later lines in the keyword's column; on multi-column
+            # pages the other columns' lines are ranked in between
+            hit = line_boxes[r]
+            lh  = hit[3] - hit[1]
+            ov  = np.minimum(line_boxes[:, 3], hit[3]) - np.maximum(line_boxes[:, 1], hit[1])
+            row = ov >= 0.5 * np.minimum(line_boxes[:, 3] - line_boxes[:, 1], lh)
+            row[r] = True
+            later = (idx > r) & ~row
+            col = later & in_col(hit[0], hit[2])
+            nxt = np.flatnonzero(col)
+            if nxt.size == 0 or line_boxes[nxt[0], 1] - hit[3] > lh:
+                # nothing directly below: a form label with its value beside
+                # it - the column spans the whole row
+                top = line_boxes[row]
+                col = later & in_col(top[:, 0].min(), top[:, 2].max())
+            else:
+                top = hit[None]
+            span = np.vstack([top, line_boxes[col][:lines_below]])
+            x1, y1 = max(int(span[:, 0].min())-10, 0), max(int(span[:, 1].min())-5, 0)
+            x2, y2 = min(int(span[:, 2].max())+10, w), min(int(span[:, 3].max())+5, h)
+            boxes.append((x1, y1, x2, y2))
+    with timed(metrics, "mask"):
+        masked = mask_boxes(img, boxes, mode=mode)
+    _count(metrics, data["text"], len(hit_ranks), masked)
     return img
 
 # ------------------------------------------------------------------ #
 # 5. Entry point                                                     #
 # ------------------------------------------------------------------ #
+class JobCancelled(Exception):
+    """process_file stopped at a page boundary because `cancel` was set."""
+
+class PageError(RuntimeError):
+    """Raised after a pooled run when one or more pages failed."""
+    def __init__(self, failures):
+        self.failures = failures          # [(page_no, exception), ...]
+        pages = ", ".join(str(p) for p, _ in failures)
+        super().__init__(f"{len(failures)} page(s) failed: {pages}")
+
+def _page_words(img, file_path, page_no, text_layer, pm=None):
+    """Text-layer word boxes for born-digital PDF pages, else None (-> OCR)."""
+    if not (text_layer and file_path.lower().endswith(".pdf")):
+        return None
+    h, w = img.shape[:2]
+    with timed(pm, "text_layer"):
+        return pdf_words(file_path, page_no, w, h)
+
+def _redact_page(img, keywords, mask_mode, address_mode, ocr_cache=None, ocr=None,
+                 data=None, pm=None):
+    if address_mode:
+        return detect_and_blur_address_entities(img, keywords, mode=mask_mode,
+                                                ocr_cache=ocr_cache, ocr=ocr,
+                                                data=data, metrics=pm)
+    return detect_and_blur_entities(img, keywords, mode=mask_mode,
+                                    ocr_cache=ocr_cache, ocr=ocr,
+                                    data=data, metrics=pm)
+
+def _timed_pages(pages, collect, track_memory=False, metrics=None, cancel=None):
+    """
+    Wrap a page iterator: yields (page_no, img, PageMetrics or None).
+    Stops early once `cancel` is set (checked at every page boundary).
+    """
+    while not (cancel is not None and cancel.is_set()):
+        if track_memory: start_memory_tracking()
+        pm = (metrics.new_page() if metrics is not None else
+              PageMetrics() if collect else None)
+        with timed(pm, "render"):
+            item = next(pages, None)
+        if item is None:
+            return
+        if pm is not None: pm.page = item[0]
+        yield item[0], item[1], pm
+
+def _encode(codec, img, pm, track_memory=False):
+    with timed(pm, "encode"):
+        enc = codec.encode(img)
+    if pm is not None:
+        pm.bytes_written = len(enc.data)
+        if track_memory: pm.peak_bytes = memory_peak()
+    return enc
+
+def _page_job(file_path, page_no, keywords, mask_mode, address_mode,
+              ocr_cache, ocr, text_layer, codec, collect=False, track_memory=False,
+              dpi=PDF_DPI):
+    """Worker side: render, redact and encode a single page."""
+    try:
+        for _, img, pm in _timed_pages(iter_pages(file_path, [page_no], dpi=dpi),
+                                       collect, track_memory):
+            data = _page_words(img, file_path, page_no, text_layer, pm)
+            out  = _redact_page(img, keywords, mask_mode, address_mode,
+                                ocr_cache, ocr, data, pm)
+            return _encode(codec, out, pm, track_memory), pm
+        raise ValueError(f"Page {page_no} not found")
+    except Exception as e:
+        # not every library exception survives pickling back to the parent
+        raise RuntimeError(f"{type(e).__name__}: {e}") from None
+
+def make_sink(file_path, output_dir, output_format, encoding, suffix="_redacted",
+              dpi=PDF_DPI):
+    """
+    PdfSink / TiffSink (<stem><suffix>.pdf/.tif) or ImageDirSink by format.
+    Pages keep the source's resolution when it has one (PDF page size,
+    TIFF DPI tags); untagged images fall back to `dpi`.
+    """
+    if output_format == "pdf":
+        return PdfSink(output_path(file_path, output_dir, ".pdf", suffix),
+                       encoding, dpi=source_resolution(file_path, dpi) or dpi)
+    if output_format == "tiff":
+        return TiffSink(output_path(file_path, output_dir, ".tif", suffix),
+                        encoding, dpi=source_resolution(file_path, dpi) or dpi)
+    if output_format == "images":
+        return ImageDirSink(output_dir, encoding)
+    raise ValueError(f"Unknown output format {output_format!r}")
+
+def _init_page_worker(backend):
+    get_backend(backend)                  # one backend (and its engines) per worker
+
+def page_pool(workers: int, ocr: Optional[OcrConfig] = None) -> ProcessPoolExecutor:
+    """
+    Long-lived process pool for process_file(pool=...): its workers keep
+    their OCR engines loaded from one file to the next.  Shut it down
+    when done.
+    """
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_page_worker,
+                               initargs=((ocr or OcrConfig()).backend,))
+
+def map_pages(job, file_path, pages, *args, workers=1, initializer=None, initargs=(),
+              cancel: Optional[threading.Event] = None,
+              pool: Optional[ProcessPoolExecutor] = None):
+    """
+    Run job(file_path, page_no, *args) for every page of `pages` and yield
+    (page_no, result, exception or None) in page order.  With workers > 1
+    the jobs run in a process pool (`initializer(*initargs)` once per
+    worker) with a bounded window of workers * 2 pages in flight, so
+    finished pages never pile up.  Pass `pool` to reuse a caller-owned
+    pool (it is left running).  Stops submitting once `cancel` is set.
+    """
+    cancelled = lambda: cancel is not None and cancel.is_set()
+    if workers <= 1 and pool is None:
+        if initializer is not None: initializer(*initargs)
+        for p in pages:
+            if cancelled():
+                return
+            try:
+                yield p, job(file_path, p, *args), None
+            except Exception as e:
+                yield p, None, e
+        return
+    own = pool is None
+    if own:
+        pool = ProcessPoolExecutor(max_workers=min(workers, len(pages) or 1),
+                                   initializer=initializer, initargs=initargs)
+    pending, it = deque(), iter(pages)
+    def submit_next():
+        p = next(it, None) if not cancelled() else None
+        if p is not None:
+            pending.append((p, pool.submit(job, file_path, p, *args)))
+    try:
+        for _ in range(max(workers, 1) * 2): submit_next()
+        while pending:
+            p, fut = pending.popleft()
+            try:
+                res, err = fut.result(), None
+            except Exception as e:
+                res, err = None, e
+            yield p, res, err
+            if cancelled():
+                return
+            submit_next()
+    finally:
+        for _, f in pending: f.cancel()
+        if own: pool.shutdown()
+
 def process_file(file_path: str, keywords: List[str], *,
                  mask_mode="blur",
                  page_numbers: Optional[List[int]] = None,
-                 address_mode=False):
-    pages = load_pages(file_path)
-    iterable = (enumerate(pages,1) if not page_numbers else
-                [(i+1,p) for i,p in enumerate(pages) if i+1 in page_numbers])
-
-    outputs=[]
-    for page_no, img in iterable:
-        if address_mode:
-            out = detect_and_blur_address_entities(img, keywords, mode=mask_mode)
+                 address_mode=False,
+                 workers: int = 1,
+                 ocr_cache: Optional[OcrCache] = None,
+                 ocr: Optional[OcrConfig] = None,
+                 text_layer: bool = False,
+                 dpi: int = PDF_DPI,
+                 output_dir: str = "",
+                 output_format: str = "images",
+                 encoding: OutputEncoding = OutputEncoding(),
+                 metrics: Optional[JobMetrics] = None,
+                 cancel: Optional[threading.Event] = None,
+                 on_error: Optional[Callable[[int, Exception], None]] = None,
+                 pool: Optional[ProcessPoolExecutor] = None):
+    """
+    Redact the selected pages of `file_path`; returns the output paths.
+    output_format="images" writes output_page_N.jpg/.png per page into
+    `output_dir` (default: current directory); "pdf" streams all pages
+    into a single <stem>_redacted.pdf (default: next to the input) and
+    "tiff" into a multi-page <stem>_redacted.tif (always lossless).
+    `encoding` picks JPEG quality or lossless PNG/Flate compression.
+
+    With workers > 1 pages are spread across a process pool: a failing
+    page is passed to `on_error(page_no, exc)` (or collected and raised as
+    PageError once every other page has been written).  Pass a
+    page_pool() as `pool` to keep the workers (and their OCR engines)
+    alive across files; `workers` then only sizes the in-flight window.
+    Pass an OcrCache to reuse OCR results across runs of the same pages,
+    and an OcrConfig to OCR a grayscale / binarised / lower-DPI copy, or
+    to OCR huge scans as overlapping tiles (OcrConfig.tile_size).
+    text_layer=True reads word boxes from a PDF's own text layer and only
+    OCRs pages without one (text inside embedded images is not seen).
+    PDF pages are rendered at `dpi`.  An OcrConfig without a source_dpi
+    gets the file's (see source_dpi); images without a DPI tag are never
+    downscaled for OCR.
+    `keywords` is compiled into a KeywordMatcher once for the whole job.
+    Pass a JobMetrics to collect per-stage timings / counters and to
+    receive per-page events.  Setting `cancel` (a threading.Event) stops
+    the job at the next page boundary: partial output is discarded and
+    JobCancelled is raised.
+    """
+    if not address_mode:
+        keywords = as_matcher(keywords)
+    ocr  = ocr or OcrConfig()
+    if ocr.source_dpi is None:
+        ocr = replace(ocr, source_dpi=source_dpi(file_path, dpi))
+    sink = make_sink(file_path, output_dir, output_format, encoding, dpi=dpi)
+    collect = metrics is not None
+    track   = collect and metrics.track_memory
+    failures = []
+
+    def write(page_no, enc, pm):
+        with timed(pm, "write"):
+            sink.write(page_no, enc)
+        if collect: metrics.add_page(pm)
+
+    def failed(page_no, e):
+        if collect: metrics.add_error(page_no, e)
+        if on_error is not None: on_error(page_no, e)
+
+    cancelled = lambda: cancel is not None and cancel.is_set()
+    if collect:
+        metrics.start(file_path, len(wanted_pages(file_path, page_numbers)))
+    try:
+        if workers <= 1 and pool is None:
+            for page_no, img, pm in _timed_pages(iter_pages(file_path, page_numbers, dpi=dpi),
+                                                 collect, track, metrics, cancel):
+                try:
+                    data = _page_words(img, file_path, page_no, text_layer, pm)
+                    out = _redact_page(img, keywords, mask_mode, address_mode,
+                                       ocr_cache, ocr, data, pm)
+                    write(page_no, _encode(sink.codec, out, pm, track), pm)
+                except Exception as e:
+                    if on_error is None: raise
+                    failed(page_no, e)
         else:
-            out = detect_and_blur_entities(img, keywords, mode=mask_mode)
-        out_path = f"output_page_{page_no}.jpg"
-        cv2.imwrite(out_path, out); outputs.append(out_path)
+            for page_no, res, err in map_pages(
+                    _page_job, file_path, wanted_pages(file_path, page_numbers),
+                    keywords, mask_mode, address_mode, ocr_cache, ocr, text_layer,
+                    sink.codec, collect, track, dpi, workers=workers, cancel=cancel,
+                    pool=pool):
+                if err is None:
+                    try:
+                        write(page_no, *res)
+                    except Exception as e:
+                        err = e
+                if err is not None:
+                    failures.append((page_no, err))
+                    failed(page_no, err)
+        if cancelled():
+            raise JobCancelled(file_path)
+        outputs = sink.close()
+    except BaseException:
+        sink.abort()
+        raise
+    finally:
+        if collect: metrics.finish()
+    if failures and on_error is None:
+        raise PageError(failures)
     return outputs
 
-__all__ = ["process_file", "load_pages"]
+__all__ = ["process_file", "load_pages", "iter_pages", "page_count", "wanted_pages",
+           "source_dpi", "source_resolution", "make_sink", "map_pages", "page_pool",
+           "PageError", "JobCancelled", "SUPPORTED_EXTS",
+           "OutputEncoding", "MASK_MODES", "OcrConfig", "JobMetrics",
+           "KeywordMatcher"]
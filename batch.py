@@ -0,0 +1,300 @@
+"""
+batch.py
+--------
+Headless batch runner on top of Blurkey.process_file (no Tk required).
+
+    python batch.py INPUT [INPUT ...] -k keywords.txt -o out/ [options]
+
+INPUT may be a file, a directory (searched recursively) or a glob.
+Each input gets its own output directory under -o (named after the input,
+extension included); inputs whose outputs are already up to date
+(same source file + same settings) are skipped.
+"""
+
+import argparse, glob, hashlib, json, os, sys, time
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from Blurkey import process_file, page_pool, PageError, SUPPORTED_EXTS, MASK_MODES
+from keyword_matcher import KeywordMatcher
+from ocr_cache import OcrCache, DEFAULT_CACHE_DIR
+from ocr_backends import BACKENDS
+from ocr_prep import OcrConfig
+from metrics import JobMetrics
+from output_sinks import OutputEncoding, ENCODINGS
+
+MANIFEST = ".blurkey.json"
+
+@dataclass
+class BatchStats:
+    files_done:    int = 0
+    files_skipped: int = 0
+    files_failed:  int = 0
+    pages:         int = 0
+    page_errors:   int = 0
+    elapsed:       float = 0.0
+    failures:      List[Tuple[str, str]] = field(default_factory=list)
+    stage_s:       Dict[str, float] = field(default_factory=dict)
+
+    def add_report(self, rep: dict) -> None:
+        self.pages += rep["pages"]; self.page_errors += len(rep["errors"])
+        for k, v in rep["stage_s"].items():
+            self.stage_s[k] = self.stage_s.get(k, 0.0) + v
+
+    def summary(self) -> str:
+        rate = self.pages / self.elapsed if self.elapsed else 0.0
+        text = (f"{self.files_done} done, {self.files_skipped} skipped, "
+                f"{self.files_failed} failed | {self.pages} pages "
+                f"({self.page_errors} page errors) in {self.elapsed:.1f}s "
+                f"= {rate:.2f} pages/s")
+        total = sum(self.stage_s.values())
+        if total:
+            text += "\nstage time: " + ", ".join(
+                f"{k} {v:.1f}s ({v/total:.0%})"
+                for k, v in sorted(self.stage_s.items(), key=lambda kv: -kv[1]))
+        return text
+
+# ------------------------------------------------------------------ #
+# Input expansion                                                    #
+# ------------------------------------------------------------------ #
+def _supported(path: str) -> bool:
+    return path.lower().endswith(SUPPORTED_EXTS)
+
+def _glob_base(spec: str) -> str:
+    """Directory part of a glob before its first wildcard component."""
+    parts = spec.replace("\\", "/").split("/")
+    keep = []
+    for part in parts[:-1]:
+        if glob.has_magic(part):
+            break
+        keep.append(part)
+    return "/".join(keep) or "."
+
+def _inside(path: str, root: Optional[str]) -> bool:
+    if not root:
+        return False
+    path, root = os.path.realpath(path), os.path.realpath(root)
+    return os.path.commonpath([path, root]) == root
+
+class OutputCollision(ValueError):
+    """Two inputs would write into the same output folder."""
+
+def expand_inputs(specs: Iterable[str], exclude: Optional[str] = None
+                  ) -> List[Tuple[str, str]]:
+    """
+    Resolve files / directories / globs into (path, relative_path) pairs;
+    the relative path (extension kept, so a.pdf and a.png differ) names
+    the input's output folder.  It mirrors the layout below a directory
+    or glob argument; plain file arguments use their file name.  Inputs
+    that would still share a folder raise OutputCollision.
+    Directory and glob inputs skip everything below `exclude` when it lies
+    inside them (the output root: `batch.py docs/ -o docs/redacted` must
+    not pick up its own outputs on the next run).
+    """
+    seen, out, owner = set(), [], {}
+    def excluded(base):
+        if not exclude or _inside(base, exclude):    # -o is the input or above it
+            return lambda path: False
+        return lambda path: _inside(path, exclude)
+    def add(path, rel):
+        key = os.path.abspath(path)
+        if key not in seen and _supported(path):
+            folder = os.path.normcase(os.path.normpath(rel))
+            if folder in owner:
+                raise OutputCollision(f"{owner[folder]} and {path} would share the "
+                                      f"output folder {rel!r}; pass their common "
+                                      f"parent directory instead")
+            seen.add(key); owner[folder] = path; out.append((path, rel))
+
+    for spec in specs:
+        if os.path.isdir(spec):
+            skip = excluded(spec)
+            for dirpath, dirs, files in os.walk(spec):
+                dirs[:] = sorted(d for d in dirs if not skip(os.path.join(dirpath, d)))
+                for name in sorted(files):
+                    path = os.path.join(dirpath, name)
+                    add(path, os.path.relpath(path, spec))
+        elif glob.has_magic(spec):
+            base = _glob_base(spec); skip = excluded(base)
+            for path in sorted(glob.glob(spec, recursive=True)):
+                if os.path.isfile(path) and not skip(path):
+                    add(path, os.path.relpath(path, base))
+        elif os.path.isfile(spec):
+            add(spec, os.path.basename(spec))
+        else:
+            print(f"warning: no such input: {spec}", file=sys.stderr)
+    return out
+
+def read_keywords(path: str) -> List[str]:
+    with open(path, encoding="utf-8") as f:
+        return [k.strip() for k in f if k.strip()]
+
+# ------------------------------------------------------------------ #
+# Up-to-date check                                                   #
+# ------------------------------------------------------------------ #
+def _fingerprint(src: str, settings: dict) -> dict:
+    st = os.stat(src)
+    blob = json.dumps(settings, sort_keys=True).encode()
+    return {"source_size": st.st_size, "source_mtime": st.st_mtime,
+            "settings": hashlib.sha1(blob).hexdigest()}
+
+def _is_up_to_date(out_dir: str, fp: dict) -> bool:
+    try:
+        with open(os.path.join(out_dir, MANIFEST), encoding="utf-8") as f:
+            man = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return (all(man.get(k) == v for k, v in fp.items())
+            and all(os.path.exists(p) for p in man.get("outputs", [])))
+
+def _write_manifest(out_dir: str, fp: dict, outputs: List[str]) -> None:
+    with open(os.path.join(out_dir, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(dict(fp, outputs=outputs), f, indent=1)
+
+# ------------------------------------------------------------------ #
+# Runner                                                             #
+# ------------------------------------------------------------------ #
+def _pool_broke(e: Exception) -> bool:
+    errors = [x for _, x in e.failures] if isinstance(e, PageError) else [e]
+    return any(isinstance(x, BrokenProcessPool) for x in errors)
+
+def run_batch(inputs: Iterable[str], keywords: List[str], out_root: str, *,
+              mask_mode="blur", address_mode=False,
+              page_numbers: Optional[List[int]] = None,
+              workers: int = 1,
+              ocr_cache: Optional[OcrCache] = None,
+              ocr: Optional[OcrConfig] = None,
+              text_layer=False,
+              output_format="pdf",
+              encoding: OutputEncoding = OutputEncoding(),
+              metrics_report=False, track_memory=False,
+              on_event: Optional[Callable[[dict], None]] = None,
+              force=False, verbose=True) -> BatchStats:
+    """
+    Redact every input; returns aggregate BatchStats.  `on_event` receives
+    the JobMetrics events of every file; metrics_report=True also writes
+    each file's JSON report to <out_dir>/metrics.json.
+    With workers > 1 one process pool serves the whole batch, so OCR
+    engines are loaded once per worker, not once per file.
+    """
+    stats    = BatchStats()
+    matcher  = keywords if address_mode else KeywordMatcher(keywords)
+    settings = {"keywords": sorted(keywords), "mask_mode": mask_mode,
+                "address_mode": address_mode, "pages": page_numbers,
+                "output_format": output_format, "encoding": asdict(encoding),
+                "ocr": asdict(ocr) if ocr else None, "text_layer": text_layer}
+    log = (lambda *a: print(*a, flush=True)) if verbose else (lambda *a: None)
+
+    t0 = time.perf_counter()
+    pool = page_pool(workers, ocr) if workers > 1 else None
+    try:
+        for src, rel in expand_inputs(inputs, exclude=out_root):
+            out_dir = os.path.join(out_root, rel)
+            try:
+                fp = _fingerprint(src, settings)
+                if not force and _is_up_to_date(out_dir, fp):
+                    stats.files_skipped += 1; log(f"skip  {src}")
+                    continue
+                os.makedirs(out_dir, exist_ok=True)
+                errors  = []
+                metrics = JobMetrics(callbacks=[on_event] if on_event else None,
+                                     track_memory=track_memory)
+                outputs = process_file(src, matcher, mask_mode=mask_mode,
+                                       page_numbers=page_numbers,
+                                       address_mode=address_mode, workers=workers,
+                                       ocr_cache=ocr_cache, ocr=ocr, text_layer=text_layer,
+                                       output_dir=out_dir,
+                                       output_format=output_format, encoding=encoding,
+                                       metrics=metrics, pool=pool,
+                                       on_error=lambda p, e: errors.append((p, e)))
+                stats.add_report(metrics.report())
+                if metrics_report:
+                    metrics.to_json(os.path.join(out_dir, "metrics.json"))
+                if errors:
+                    raise PageError(errors)
+                _write_manifest(out_dir, fp, outputs)
+                stats.files_done += 1
+                log(f"done  {src} -> {', '.join(outputs) if len(outputs) == 1 else out_dir}")
+            except Exception as e:
+                stats.files_failed += 1; stats.failures.append((src, str(e)))
+                log(f"FAIL  {src}: {e}")
+                if pool is not None and _pool_broke(e):     # a worker died
+                    pool.shutdown(); pool = page_pool(workers, ocr)
+    finally:
+        if pool is not None: pool.shutdown()
+    stats.elapsed = time.perf_counter() - t0
+    return stats
+
+def parse_pages(s: str) -> Optional[List[int]]:
+    """argparse type for -p: "3,1,3" -> [1, 3]; blank -> None (all pages)."""
+    if not s or not s.strip():
+        return None
+    pages = [int(x) for x in s.split(",") if x.strip()]
+    if any(p < 1 for p in pages):
+        raise argparse.ArgumentTypeError("page numbers start at 1")
+    return sorted(set(pages))
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Batch keyword / address redaction.")
+    ap.add_argument("inputs", nargs="+", help="files, directories or globs")
+    ap.add_argument("-k", "--keywords", required=True, help="keyword file, one per line")
+    ap.add_argument("-o", "--out", required=True, help="output root directory")
+    ap.add_argument("-m", "--mask-mode", default="blur", choices=MASK_MODES)
+    ap.add_argument("-a", "--address", action="store_true", help="address mode")
+    ap.add_argument("-p", "--pages", type=parse_pages, default=None,
+                    help="comma-separated page numbers (default: all)")
+    ap.add_argument("-w", "--workers", type=int, default=1)
+    ap.add_argument("--format", default="pdf", choices=["pdf", "tiff", "images"],
+                    help="one redacted PDF / multi-page TIFF per input, or one image per page")
+    ap.add_argument("-e", "--encoding", default="jpeg", choices=ENCODINGS)
+    ap.add_argument("--jpeg-quality", type=int, default=95)
+    ap.add_argument("--png-level", type=int, default=3, choices=range(10), metavar="0-9")
+    ap.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    ap.add_argument("--no-cache", action="store_true")
+    ap.add_argument("--ocr-dpi", type=int, default=None,
+                    help="downscale pages to this DPI for OCR (masks stay full-res; "
+                         "images without a DPI tag are left as they are)")
+    ap.add_argument("--grayscale", action="store_true", help="OCR a grayscale copy")
+    ap.add_argument("--binarize", action="store_true", help="OCR an adaptively thresholded copy")
+    ap.add_argument("--ocr-backend", default="auto", choices=BACKENDS,
+                    help="tesserocr keeps one Tesseract engine per worker (default if installed)")
+    ap.add_argument("--tile-size", type=int, default=0, metavar="PX",
+                    help="OCR pages larger than this as overlapping tiles (huge scans)")
+    ap.add_argument("--tile-overlap", type=int, default=256, metavar="PX")
+    ap.add_argument("-t", "--text-layer", action="store_true",
+                    help="use PDF text layers where present, OCR only the other pages")
+    ap.add_argument("-f", "--force", action="store_true", help="ignore up-to-date outputs")
+    ap.add_argument("--metrics", action="store_true",
+                    help="write a per-input metrics.json (stage timings, counters)")
+    ap.add_argument("--track-memory", action="store_true",
+                    help="record peak memory in the metrics (slower)")
+    ap.add_argument("-q", "--quiet", action="store_true")
+    args = ap.parse_args(argv)
+
+    keywords = read_keywords(args.keywords)
+    if not keywords:
+        ap.error("keyword file is empty")
+    try:
+        expand_inputs(args.inputs, exclude=args.out)     # fail before any work
+    except OutputCollision as e:
+        ap.error(str(e))
+    stats = run_batch(args.inputs, keywords, args.out,
+                      mask_mode=args.mask_mode, address_mode=args.address,
+                      page_numbers=args.pages, workers=args.workers,
+                      ocr_cache=None if args.no_cache else OcrCache(args.cache_dir),
+                      ocr=OcrConfig(target_dpi=args.ocr_dpi, grayscale=args.grayscale,
+                                    binarize=args.binarize, backend=args.ocr_backend,
+                                    tile_size=args.tile_size,
+                                    tile_overlap=args.tile_overlap),
+                      text_layer=args.text_layer,
+                      metrics_report=args.metrics, track_memory=args.track_memory,
+                      output_format=args.format,
+                      encoding=OutputEncoding(args.encoding, args.jpeg_quality,
+                                              args.png_level),
+                      force=args.force, verbose=not args.quiet)
+    print(stats.summary())
+    return 1 if stats.files_failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
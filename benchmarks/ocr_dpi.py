@@ -0,0 +1,78 @@
+"""
+benchmarks/ocr_dpi.py
+---------------------
+OCR speed vs keyword recall at several OCR resolutions.
+
+    python benchmarks/ocr_dpi.py                       # synthetic 300-DPI pages
+    python benchmarks/ocr_dpi.py doc.pdf -k kw.txt     # your own document class
+
+For every OCR setting the same 300-DPI pages are OCR'd through
+Blurkey._ocr_data; recall is the share of keyword occurrences (synthetic
+ground truth, or the 300-DPI colour run for real documents) still found.
+"""
+
+import argparse, os, sys, time
+from collections import Counter
+from dataclasses import replace
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE)); sys.path.insert(0, HERE)
+from Blurkey import _ocr_data, iter_pages, source_dpi         # noqa: E402
+from keyword_matcher import KeywordMatcher, normalize_tokens  # noqa: E402
+from ocr_prep import OcrConfig                                # noqa: E402
+from synthetic import KEYWORDS, make_document                 # noqa: E402
+
+SETTINGS = [
+    ("300 colour",    OcrConfig()),
+    ("300 gray",      OcrConfig(grayscale=True)),
+    ("200 gray",      OcrConfig(target_dpi=200, grayscale=True)),
+    ("150 gray",      OcrConfig(target_dpi=150, grayscale=True)),
+    ("200 binarized", OcrConfig(target_dpi=200, binarize=True)),
+    ("150 binarized", OcrConfig(target_dpi=150, binarize=True)),
+]
+
+def found(data, matcher):
+    toks = normalize_tokens(data["text"])
+    return Counter(" ".join(toks[i:j]) for i, j in matcher.find(toks))
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    ap.add_argument("document", nargs="?")
+    ap.add_argument("-k", "--keywords")
+    ap.add_argument("-p", "--pages", type=int, default=3, help="pages to sample")
+    args = ap.parse_args(argv)
+    if args.document and not args.keywords:
+        ap.error("-k/--keywords is required with a document")
+
+    if args.document:
+        with open(args.keywords, encoding="utf-8") as f:
+            keywords = [k.strip() for k in f if k.strip()]
+        matcher = KeywordMatcher(keywords)
+        pages = [(img, None) for _, img in
+                 iter_pages(args.document, list(range(1, args.pages + 1)))]
+    else:
+        matcher = KeywordMatcher(KEYWORDS)
+        pages = [(p.img, found(p.words, matcher))
+                 for p in make_document(args.pages, dpi=300, seed=1)]
+
+    dpi = source_dpi(args.document) if args.document else 300
+    reference = None
+    print(f"{'setting':<15}{'s/page':>9}{'speedup':>9}{'recall':>9}")
+    for name, cfg in SETTINGS:
+        cfg = replace(cfg, source_dpi=dpi)
+        hits, secs = [], 0.0
+        for img, _ in pages:
+            t = time.perf_counter()
+            data = _ocr_data(img, None, cfg)
+            secs += time.perf_counter() - t
+            hits.append(found(data, matcher))
+        if reference is None:
+            base_secs = secs
+            reference = [t if t is not None else h for (_, t), h in zip(pages, hits)]
+        want = sum(sum(t.values()) for t in reference)
+        got  = sum(sum((h & t).values()) for h, t in zip(hits, reference))
+        recall = got / want if want else float("nan")
+        print(f"{name:<15}{secs/len(pages):>9.2f}{base_secs/secs:>8.2f}x{recall:>9.1%}")
+
+if __name__ == "__main__":
+    main()
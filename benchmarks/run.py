@@ -0,0 +1,149 @@
+"""
+benchmarks/run.py
+-----------------
+Reproducible offline benchmark of Blurkey.process_file on synthetic
+documents with ground truth (see synthetic.py).
+
+    python benchmarks/run.py                         # all cases, real Tesseract
+    python benchmarks/run.py --oracle                # ground-truth "OCR": times
+                                                     # everything except Tesseract
+    python benchmarks/run.py -o base.json            # save a baseline
+    python benchmarks/run.py --compare base.json     # diff against one
+
+Each case runs in a fresh process so peak RSS is per case.  Pages are
+masked in "fill" mode and written losslessly, so every masked pixel can
+be identified exactly:
+  recall    - share of planted keyword / address regions with no ink left
+  leaked_px - ink pixels of planted regions that survived masking
+  precision - share of masked pixels that fall inside planted regions
+"""
+
+import argparse, json, os, platform, sys, tempfile, time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import cv2, numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE)); sys.path.insert(0, HERE)
+from synthetic import make_document, write_document, KEYWORDS, ADDRESS_KEYWORD, INK  # noqa: E402
+
+# name: (dpi, density, pages, container, address_mode)
+CASES = {
+    "pdf-150-normal":  (150, "normal", 4, "pdf", False),
+    "pdf-300-sparse":  (300, "sparse", 4, "pdf", False),
+    "pdf-300-dense":   (300, "dense",  4, "pdf", False),
+    "png-300-dense":   (300, "dense",  1, "png", False),
+    "pdf-300-address": (300, "normal", 4, "pdf", True),
+}
+PAD = 15            # px of slack around planted regions for precision
+
+def _rss_bytes():
+    try:
+        import resource
+    except ImportError:
+        return None
+    r = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return r if sys.platform == "darwin" else r * 1024
+
+def _seed_oracle(doc_path, pages, cache, dpi):
+    """Pre-load the OCR cache with ground-truth words for every page."""
+    from Blurkey import _ocr_cache_key, iter_pages
+    from ocr_prep import OcrConfig, prepare
+    ocr = OcrConfig(source_dpi=dpi)
+    for (_, img), page in zip(iter_pages(doc_path, dpi=dpi), pages):
+        cache.put(_ocr_cache_key(prepare(img, ocr)[0], ocr), page.words)
+    return ocr
+
+def _score(pages, outputs, address_mode):
+    hit = total = leaked = masked_in = masked_all = 0
+    for page, out_path in zip(pages, outputs):
+        out = cv2.imread(out_path)
+        h = min(out.shape[0], page.img.shape[0]); w = min(out.shape[1], page.img.shape[1])
+        out, ref = out[:h, :w], page.img[:h, :w]
+        ink    = np.all(ref == INK, axis=2)
+        masked = np.all(out == 0, axis=2)
+        truth  = np.zeros_like(masked)
+        for x1, y1, x2, y2 in (page.address_boxes if address_mode else page.keyword_boxes):
+            left = int(np.count_nonzero(ink[y1:y2, x1:x2] & ~masked[y1:y2, x1:x2]))
+            total += 1; hit += left == 0; leaked += left
+            truth[max(y1-PAD, 0):y2+PAD, max(x1-PAD, 0):x2+PAD] = True
+        masked_all += int(masked.sum()); masked_in += int((masked & truth).sum())
+    return {"regions": total,
+            "recall": round(hit / total, 4) if total else None,
+            "leaked_px": leaked,
+            "precision": round(masked_in / masked_all, 4) if masked_all else None}
+
+def run_case(name, oracle=False, workers=1, workdir=None):
+    """Runs in a fresh process; returns the case result dict."""
+    from Blurkey import process_file
+    from metrics import JobMetrics
+    from ocr_cache import OcrCache
+    from output_sinks import OutputEncoding
+
+    dpi, density, n, container, address = CASES[name]
+    workdir = workdir or tempfile.mkdtemp(prefix="blurkey-bench-")
+    pages = make_document(n, dpi, density, seed=7, address=address)
+    doc = write_document(pages, os.path.join(workdir, f"{name}.{container}"), dpi)
+
+    cache, ocr = None, None
+    if oracle:
+        cache = OcrCache(os.path.join(workdir, "oracle-cache"))
+        ocr = _seed_oracle(doc, pages, cache, dpi)
+    out_dir = os.path.join(workdir, "out"); os.makedirs(out_dir, exist_ok=True)
+
+    metrics = JobMetrics()
+    outputs = process_file(doc, [ADDRESS_KEYWORD] if address else KEYWORDS,
+                           mask_mode="fill", address_mode=address, workers=workers,
+                           ocr_cache=cache, ocr=ocr, dpi=dpi, output_dir=out_dir,
+                           output_format="images",
+                           encoding=OutputEncoding("lossless", png_compression=1),
+                           metrics=metrics)
+    rep = metrics.report()
+    return dict(_score(pages, outputs, address),
+                pages=rep["pages"], elapsed_s=rep["elapsed_s"],
+                pages_per_s=rep["pages_per_s"], stage_s=rep["stage_s"],
+                peak_rss_bytes=_rss_bytes())
+
+def compare(results, baseline):
+    print(f"\n{'case':<18}{'pages/s':>16}{'recall':>16}{'precision':>18}")
+    for name, r in results.items():
+        b = baseline.get(name)
+        if not b:
+            continue
+        fmt = lambda k: f"{b.get(k)} -> {r.get(k)}"
+        print(f"{name:<18}{fmt('pages_per_s'):>16}{fmt('recall'):>16}{fmt('precision'):>18}")
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Blurkey synthetic benchmark")
+    ap.add_argument("cases", nargs="*", default=list(CASES), help=f"{', '.join(CASES)}")
+    ap.add_argument("--oracle", action="store_true",
+                    help="serve ground-truth words from the OCR cache instead of Tesseract")
+    ap.add_argument("-w", "--workers", type=int, default=1)
+    ap.add_argument("-o", "--output", help="write results JSON (baseline)")
+    ap.add_argument("--compare", help="baseline JSON to diff against")
+    args = ap.parse_args(argv)
+
+    results = {}
+    ctx = get_context("spawn")
+    for name in args.cases:
+        with ProcessPoolExecutor(1, mp_context=ctx) as ex:   # fresh RSS per case
+            r = ex.submit(run_case, name, args.oracle, args.workers).result()
+        results[name] = r
+        print(f"{name:<18} {r['pages_per_s']:>7} pages/s  recall {r['recall']}  "
+              f"leaked {r['leaked_px']}px  precision {r['precision']}  "
+              f"rss {(r['peak_rss_bytes'] or 0) / 2**20:.0f} MiB", flush=True)
+
+    doc = {"created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+           "python": platform.python_version(), "platform": platform.platform(),
+           "oracle": args.oracle, "workers": args.workers, "cases": results}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(doc, f, indent=1)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(results, json.load(f)["cases"])
+
+if __name__ == "__main__":
+    main()
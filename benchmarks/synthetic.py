@@ -0,0 +1,128 @@
+"""
+benchmarks/synthetic.py
+-----------------------
+Deterministic synthetic documents with ground truth for the benchmarks.
+
+Every page is plain text drawn word by word (so each word's box is known)
+in ink colour INK on white.  Keyword phrases and address blocks are
+planted at random lines; the generator returns the page image, the
+ground-truth regions that must be masked and an image_to_data-shaped
+dict of the words (used as an OCR oracle).
+"""
+
+import os, sys
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+import cv2, numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from output_sinks import OutputEncoding, PdfSink   # noqa: E402
+
+INK = (60, 60, 60)                       # never produced by fill-mode masking
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+A4_IN = (8.27, 11.69)
+
+KEYWORDS = ["Acme Corporation", "John Smith", "4471 0098 2231", "Confidential"]
+ADDRESS_KEYWORD = "Address:"
+ADDRESS_LINES = ["221B Baker Street", "Marylebone London", "NW1 6XE United Kingdom"]
+FILLER = ("lorem ipsum dolor sit amet consectetur adipiscing elit sed do "
+          "eiusmod tempor incididunt ut labore et dolore magna aliqua").split()
+
+DENSITY = {"sparse": 0.1, "normal": 0.3, "dense": 0.6}   # P(keyword on a line)
+
+Box = Tuple[int, int, int, int]
+
+@dataclass
+class SynthPage:
+    img: np.ndarray
+    keyword_boxes: List[Box] = field(default_factory=list)  # one per phrase hit
+    address_boxes: List[Box] = field(default_factory=list)  # keyword + lines below
+    words: Dict[str, List] = field(default_factory=dict)    # image_to_data shape
+
+def _union(boxes: List[Box]) -> Box:
+    xs1, ys1, xs2, ys2 = zip(*boxes)
+    return min(xs1), min(ys1), max(xs2), max(ys2)
+
+def make_page(dpi=300, density="normal", seed=0, pt=11, address=False,
+              lines_below=4) -> SynthPage:
+    rng = np.random.default_rng(seed)
+    W, H = int(A4_IN[0] * dpi), int(A4_IN[1] * dpi)
+    img = np.full((H, W, 3), 255, np.uint8)
+    scale = pt * dpi / 72 * 0.7 / 22          # Hershey simplex cap height ~22px
+    thick = max(1, int(round(scale * 2)))
+    (_, cap), _ = cv2.getTextSize("A", FONT, scale, thick)
+    space = int(cv2.getTextSize(" ", FONT, scale, thick)[0][0] * 1.5)
+    step  = int(pt * dpi / 72 * 1.6)
+    margin = int(0.8 * dpi)
+
+    # plan the lines first so address blocks stay contiguous
+    plan, n_lines = [], (H - 2 * margin) // step
+    while len(plan) < n_lines:
+        if address and rng.random() < 0.08 and len(plan) + 1 + len(ADDRESS_LINES) < n_lines:
+            plan.append(("addr_kw", [ADDRESS_KEYWORD, "Head", "Office"]))
+            plan += [("addr", line.split()) for line in ADDRESS_LINES]
+            continue
+        words = list(rng.choice(FILLER, size=int(rng.integers(4, 9))))
+        kw = None
+        if not address and rng.random() < DENSITY[density]:
+            kw = KEYWORDS[int(rng.integers(len(KEYWORDS)))]
+            at = int(rng.integers(len(words) + 1))
+            words[at:at] = kw.split()
+        plan.append(("kw", (words, kw)) if kw else ("text", words))
+
+    page = SynthPage(img)
+    cols = ("level", "block_num", "par_num", "line_num", "word_num",
+            "left", "top", "width", "height", "conf", "text")
+    page.words = {c: [] for c in cols}
+    line_boxes: List[Box] = []
+    addr_start: List[int] = []
+    for li, (kind, payload) in enumerate(plan):
+        words, kw = (payload if kind == "kw" else (payload, None))
+        y = margin + li * step + cap
+        x = margin
+        boxes = []
+        page.words["level"].append(4)
+        for c, v in zip(cols[1:], (1, 1, li + 1, 0, x, y - cap, 0, cap, -1, "")):
+            page.words[c].append(v)
+        for wi, w in enumerate(words, 1):
+            (tw, th), base = cv2.getTextSize(w, FONT, scale, thick)
+            if x + tw > W - margin:
+                break
+            cv2.putText(img, w, (x, y), FONT, scale, INK, thick, cv2.LINE_8)
+            box = (x - thick, y - th - thick, x + tw + thick, y + base + thick)
+            boxes.append(box)
+            for c, v in zip(cols, (5, 1, 1, li + 1, wi, box[0], box[1],
+                                   box[2] - box[0], box[3] - box[1], 95, w)):
+                page.words[c].append(v)
+            x += tw + space
+        line_boxes.append(_union(boxes) if boxes else (margin, y - cap, margin, y))
+        if kw:
+            n = len(kw.split()); toks = [w for w in words[:len(boxes)]]
+            for s in range(len(toks) - n + 1):
+                if " ".join(toks[s:s+n]) == kw:
+                    page.keyword_boxes.append(_union(boxes[s:s+n]))
+        if kind == "addr_kw":
+            addr_start.append(li)
+    for li in addr_start:
+        page.address_boxes.append(_union(line_boxes[li: li + lines_below + 1]))
+    return page
+
+def make_document(n_pages=3, dpi=300, density="normal", seed=0, **kw) -> List[SynthPage]:
+    return [make_page(dpi, density, seed * 1000 + i, **kw) for i in range(n_pages)]
+
+def write_document(pages: List[SynthPage], path: str, dpi=300) -> str:
+    """Save as a lossless multi-page PDF, or a single-page image file."""
+    if path.lower().endswith(".pdf"):
+        sink = PdfSink(path, OutputEncoding("lossless", png_compression=1), dpi=dpi)
+        for i, p in enumerate(pages, 1):
+            sink.write(i, sink.codec.encode(p.img))
+        sink.close()
+    else:
+        if len(pages) != 1:
+            raise ValueError("image documents hold exactly one page")
+        cv2.imwrite(path, pages[0].img)
+    return path
+
+__all__ = ["SynthPage", "make_page", "make_document", "write_document",
+           "KEYWORDS", "ADDRESS_KEYWORD", "INK", "DENSITY"]
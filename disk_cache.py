@@ -0,0 +1,83 @@
+"""
+disk_cache.py
+-------------
+Size-capped directory of cache files shared by OcrCache and
+ThumbnailCache.  Writes are atomic (temp file + os.replace, safe across
+pool workers) and total size is capped with LRU eviction: reads touch an
+entry's mtime, so least-recently-read entries go first.  The directory
+is scanned once per process and then tracked as a running total;
+crossing max_bytes evicts down to LOW_WATER of it, so scans stay rare as
+the cache fills.
+"""
+
+import os, tempfile
+from typing import Callable, List, Optional
+
+LOW_WATER = 0.9                  # evict down to this share of max_bytes
+
+class DiskCache:
+    def __init__(self, cache_dir: str, max_bytes: int, suffix: str):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.suffix = suffix                 # only files ending in it are entries
+        self._bytes: Optional[int] = None    # running total; None = not scanned yet
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _touch(self, path: str) -> None:
+        try:
+            os.utime(path)                   # mark as recently used
+        except OSError:
+            pass
+
+    def _store(self, path: str, write: Callable) -> None:
+        """Write an entry via write(file object), then enforce the size cap."""
+        try:
+            old = os.path.getsize(path)
+        except OSError:
+            old = 0
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+                size = f.tell()
+            os.replace(tmp, path)            # atomic: safe across workers
+        except BaseException:
+            if os.path.exists(tmp): os.remove(tmp)
+            raise
+        if self._bytes is None:
+            self._scan()
+        else:                                # other workers' writes show up
+            self._bytes += size - old        # at the next scan
+        if self._bytes > self.max_bytes:
+            self.evict(int(self.max_bytes * LOW_WATER))
+
+    def _scan(self) -> List[tuple]:
+        """(mtime, size, path) of every entry; resets the running total."""
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for e in it:
+                if e.name.endswith(self.suffix):
+                    try:
+                        st = e.stat()
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, e.path))
+        self._bytes = sum(size for _, size, _ in entries)
+        return entries
+
+    def evict(self, target: Optional[int] = None) -> None:
+        """Drop least-recently-used entries down to `target` bytes (default max_bytes)."""
+        target = self.max_bytes if target is None else target
+        entries = self._scan()
+        for _, size, path in sorted(entries):
+            if self._bytes <= target:
+                break
+            try:
+                os.remove(path); self._bytes -= size
+            except OSError:
+                pass
+
+    def clear(self) -> None:
+        self.evict(0)
+
+__all__ = ["DiskCache", "LOW_WATER"]
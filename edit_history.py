@@ -0,0 +1,106 @@
+"""
+edit_history.py
+---------------
+Patch-based undo / redo for in-place image edits.
+
+Each edit keeps only the pixels of its rectangle, never a whole-image
+copy.  An entry holds one patch at a time: the "before" pixels while it
+can be undone; undo swaps them with the current ("after") pixels, which
+the entry then keeps for redo.  Once the patches exceed `max_bytes` the
+oldest undo steps are dropped (`truncated` tells the caller that undo
+can no longer reach the original image).
+
+    history = EditHistory()
+    with history.edit(img, x1, y1, x2, y2):
+        img[y1:y2, x1:x2] = 255
+    rect = history.undo(img)          # changed rectangle, or None
+"""
+
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, List, Optional, Tuple
+
+import numpy as np
+
+Rect = Tuple[int, int, int, int]          # x1, y1, x2, y2
+
+class EditHistory:
+    def __init__(self, max_bytes: int = 256 * 2**20):
+        self.max_bytes = max_bytes
+        self.truncated = False
+        self._undo: Deque[Tuple[Rect, np.ndarray]] = deque()
+        self._redo: List[Tuple[Rect, np.ndarray]] = []
+        self._bytes = 0
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    @staticmethod
+    def _clip(img, x1, y1, x2, y2) -> Rect:
+        h, w = img.shape[:2]
+        return max(x1, 0), max(y1, 0), min(x2, w), min(y2, h)
+
+    @contextmanager
+    def edit(self, img, x1: int, y1: int, x2: int, y2: int):
+        """Record the rectangle's pixels, then let the caller change them."""
+        rect = self._clip(img, x1, y1, x2, y2)
+        x1, y1, x2, y2 = rect
+        before = img[y1:y2, x1:x2].copy()
+        yield rect
+        if before.size:
+            self.push(rect, before)
+
+    def push(self, rect: Rect, before: np.ndarray) -> None:
+        """Add an already-applied edit (`before` = its old pixels)."""
+        self._bytes -= sum(p.nbytes for _, p in self._redo)
+        self._redo.clear()                 # a new edit forks the history
+        self._undo.append((rect, before))
+        self._bytes += before.nbytes
+        while self._bytes > self.max_bytes and len(self._undo) > 1:
+            _, old = self._undo.popleft()  # oldest first
+            self._bytes -= old.nbytes
+            self.truncated = True
+
+    @staticmethod
+    def _swap(img, rect: Rect, patch: np.ndarray) -> np.ndarray:
+        x1, y1, x2, y2 = rect
+        current = img[y1:y2, x1:x2].copy()
+        img[y1:y2, x1:x2] = patch
+        return current
+
+    def undo(self, img) -> Optional[Rect]:
+        if not self._undo:
+            return None
+        rect, before = self._undo.pop()
+        self._redo.append((rect, self._swap(img, rect, before)))
+        return rect
+
+    def redo(self, img) -> Optional[Rect]:
+        if not self._redo:
+            return None
+        rect, after = self._redo.pop()
+        self._undo.append((rect, self._swap(img, rect, after)))
+        return rect
+
+    def undo_all(self, img) -> Optional[Rect]:
+        """Undo every step still held; returns the union of changed rects."""
+        rects = []
+        while self._undo:
+            rects.append(self.undo(img))
+        if not rects:
+            return None
+        xs1, ys1, xs2, ys2 = zip(*rects)
+        return min(xs1), min(ys1), max(xs2), max(ys2)
+
+    def clear(self) -> None:
+        self._undo.clear(); self._redo.clear()
+        self._bytes = 0; self.truncated = False
+
+__all__ = ["EditHistory"]
@@ -0,0 +1,66 @@
+"""
+keyword_matcher.py
+------------------
+Token-level trie for multi-word keyword matching over OCR output.
+Compile once per job, reuse across pages and files; matching is a single
+pass over the tokens and does not depend on the size of the keyword list.
+
+Match semantics
+  • Keywords and tokens are compared case-insensitively, word by word
+    (keyword "John  Smith" == tokens ["john", "smith"]).
+  • Empty tokens never match, so a phrase cannot span an OCR row with no
+    text (Tesseract emits those between blocks / paragraphs / lines).
+  • At every token the longest keyword starting there is reported.
+  • Nested matches (fully inside an earlier reported match) are dropped;
+    overlapping ones are kept, so their union covers every matched word.
+"""
+
+from typing import Iterable, List, Sequence, Tuple, Union
+
+_END = ""          # terminal marker; real tokens are never empty
+
+def normalize_tokens(texts: Iterable[str]) -> List[str]:
+    return [t.strip().lower() for t in texts]
+
+class KeywordMatcher:
+    def __init__(self, keywords: Iterable[str]):
+        self.root    = {}
+        self.max_len = 0
+        self.size    = 0
+        for kw in keywords:
+            words = kw.lower().split()
+            if not words:
+                continue
+            node = self.root
+            for w in words:
+                node = node.setdefault(w, {})
+            if _END not in node:
+                node[_END] = True; self.size += 1
+            self.max_len = max(self.max_len, len(words))
+
+    def __len__(self):
+        return self.size
+
+    def _longest_at(self, tokens: Sequence[str], i: int) -> int:
+        node, best = self.root, 0
+        for j in range(i, min(len(tokens), i + self.max_len)):
+            node = node.get(tokens[j]) if tokens[j] else None
+            if node is None:
+                break
+            if _END in node:
+                best = j - i + 1
+        return best
+
+    def find(self, tokens: Sequence[str]) -> List[Tuple[int, int]]:
+        """Return (start, end) token spans, end exclusive, in token order."""
+        spans, covered = [], 0
+        for i in range(len(tokens)):
+            L = self._longest_at(tokens, i)
+            if L and i + L > covered:
+                spans.append((i, i + L)); covered = i + L
+        return spans
+
+def as_matcher(keywords: Union["KeywordMatcher", Iterable[str]]) -> KeywordMatcher:
+    return keywords if isinstance(keywords, KeywordMatcher) else KeywordMatcher(keywords)
+
+__all__ = ["KeywordMatcher", "as_matcher", "normalize_tokens"]
@@ -96,6 +96,11 @@
 ##################################
 import cv2, numpy as np, os, tkinter as tk
 from tkinter import filedialog
+from edit_history import EditHistory
+from logo_compositor import LogoCompositor
+
+WIN     = "Image Editor"
+WAIT_MS = 30           # idle key poll; HighGUI keeps delivering mouse events
 
 # Global holders
 main_img = None        # Original image
@@ -104,7 +109,9 @@ scale    = 1.0
 dirty    = False
 erase_start = None
 logo_start = None
-logo_img = None
+logo     = None        # LogoCompositor for the chosen logo
+band     = []          # [(x, y, saved display pixels)] under the rubber band
+history  = EditHistory()   # pixel patches of every erase / logo placement
 
 def _browse(title):
     root = tk.Tk(); root.withdraw()
@@ -116,102 +123,171 @@ def _resize_for_display(img, max_width=900):
     h, w = img.shape[:2]
     if w > max_width:
         scale = max_width / w
-        return cv2.resize(img, None, fx=scale, fy=scale), scale
+        return cv2.resize(img, None, fx=scale, fy=scale,
+                          interpolation=cv2.INTER_AREA), scale
     return img.copy(), 1.0
 
+def _refresh(x1, y1, x2, y2):
+    """Re-scale only the edited image rectangle into disp_img."""
+    dh, dw = disp_img.shape[:2]
+    ih, iw = main_img.shape[:2]
+    dx1, dy1 = int(x1 * scale), int(y1 * scale)
+    dx2, dy2 = min(int(np.ceil(x2 * scale)), dw), min(int(np.ceil(y2 * scale)), dh)
+    if dx2 <= dx1 or dy2 <= dy1:
+        return
+    sx1, sy1 = int(dx1 / scale), int(dy1 / scale)
+    sx2, sy2 = min(int(np.ceil(dx2 / scale)), iw), min(int(np.ceil(dy2 / scale)), ih)
+    disp_img[dy1:dy2, dx1:dx2] = cv2.resize(main_img[sy1:sy2, sx1:sx2],
+                                            (dx2 - dx1, dy2 - dy1),
+                                            interpolation=cv2.INTER_AREA)
+
+# ============================
+# Rubber band (drawn in place)
+# ============================
+def _band_clear():
+    global band
+    for x, y, patch in reversed(band):
+        disp_img[y:y + patch.shape[0], x:x + patch.shape[1]] = patch
+    band = []
+
+def _band_draw(p1, p2, colour):
+    """Save the thin strips under the new rectangle, then draw it."""
+    global band
+    _band_clear()
+    h, w = disp_img.shape[:2]
+    x1, x2 = sorted((p1[0], p2[0])); y1, y2 = sorted((p1[1], p2[1]))
+    X1, Y1, X2, Y2 = max(x1 - 2, 0), max(y1 - 2, 0), min(x2 + 3, w), min(y2 + 3, h)
+    strips = [(X1, Y1, X2, min(y1 + 3, Y2)), (X1, max(y2 - 2, Y1), X2, Y2),
+              (X1, Y1, min(x1 + 3, X2), Y2), (max(x2 - 2, X1), Y1, X2, Y2)]
+    band = [(sx1, sy1, disp_img[sy1:sy2, sx1:sx2].copy())
+            for sx1, sy1, sx2, sy2 in strips if sx2 > sx1 and sy2 > sy1]
+    cv2.rectangle(disp_img, p1, p2, colour, 2)
+    cv2.imshow(WIN, disp_img)
+
+def _to_image(x, y):
+    h, w = main_img.shape[:2]
+    return min(max(int(x / scale), 0), w), min(max(int(y / scale), 0), h)
+
+def _drag_rect(start, x_orig, y_orig):
+    x1, x2 = sorted((start[0], x_orig)); y1, y2 = sorted((start[1], y_orig))
+    return x1, y1, x2, y2
+
 # ============================
 # CALLBACKS with scaling fix
 # ============================
 def _erase_cb(evt, x, y, flags, param):
-    global erase_start, main_img, disp_img, dirty, scale
-    x_orig, y_orig = int(x / scale), int(y / scale)
+    global erase_start, dirty
+    x_orig, y_orig = _to_image(x, y)
 
     if evt == cv2.EVENT_LBUTTONDOWN:
         erase_start = (x_orig, y_orig)
     elif evt == cv2.EVENT_MOUSEMOVE and erase_start:
-        tmp = disp_img.copy()
         x1, y1 = int(erase_start[0] * scale), int(erase_start[1] * scale)
-        cv2.rectangle(tmp, (x1, y1), (x, y), (0, 255, 0), 2)
-        cv2.imshow("Image Editor", tmp)
+        _band_draw((x1, y1), (x, y), (0, 255, 0))
     elif evt == cv2.EVENT_LBUTTONUP and erase_start:
-        x1, y1 = erase_start
-        x2, y2 = x_orig, y_orig
-        x1, x2 = sorted((x1, x2)); y1, y2 = sorted((y1, y2))
+        _band_clear()
+        x1, y1, x2, y2 = _drag_rect(erase_start, x_orig, y_orig)
         if (x2 - x1 > 0) and (y2 - y1 > 0):
-            main_img[y1:y2, x1:x2] = 255
+            with history.edit(main_img, x1, y1, x2, y2):
+                main_img[y1:y2, x1:x2] = 255
             dirty = True
+            _refresh(x1, y1, x2, y2)
         erase_start = None
-        disp_img[:]=cv2.resize(main_img, None, fx=scale, fy=scale)
-        cv2.imshow("Image Editor", disp_img)
+        cv2.imshow(WIN, disp_img)
 
 def _logo_cb(evt, x, y, flags, param):
-    global logo_start, main_img, disp_img, dirty, scale, logo_img
-    x_orig, y_orig = int(x / scale), int(y / scale)
+    global logo_start, dirty
+    x_orig, y_orig = _to_image(x, y)
 
     if evt == cv2.EVENT_LBUTTONDOWN:
         logo_start = (x_orig, y_orig)
     elif evt == cv2.EVENT_MOUSEMOVE and logo_start:
-        tmp = disp_img.copy()
         x1, y1 = int(logo_start[0] * scale), int(logo_start[1] * scale)
-        cv2.rectangle(tmp, (x1, y1), (x, y), (255, 0, 0), 2)
-        cv2.imshow("Image Editor", tmp)
+        _band_draw((x1, y1), (x, y), (255, 0, 0))
     elif evt == cv2.EVENT_LBUTTONUP and logo_start:
-        x1, y1 = logo_start
-        x2, y2 = x_orig, y_orig
-        x1, x2 = sorted((x1, x2)); y1, y2 = sorted((y1, y2))
+        _band_clear()
+        x1, y1, x2, y2 = _drag_rect(logo_start, x_orig, y_orig)
         if (x2 - x1 > 0) and (y2 - y1 > 0):
-            roi_h, roi_w = y2 - y1, x2 - x1
-            logo_resized = cv2.resize(logo_img, (roi_w, roi_h), interpolation=cv2.INTER_AREA)
-            mask = cv2.GaussianBlur(np.ones((roi_h, roi_w), dtype=np.uint8) * 255,
-                                    (0, 0), sigmaX=roi_w * 0.05)
-
-            logo_f = logo_resized.astype(np.float32)
-            roi_f = main_img[y1:y2, x1:x2].astype(np.float32)
-            alpha = (mask / 255.0)[..., None]
-
-            blended = (logo_f * alpha + roi_f * (1 - alpha)).astype(np.uint8)
-            main_img[y1:y2, x1:x2] = blended
+            with history.edit(main_img, x1, y1, x2, y2):
+                logo.place(main_img, x1, y1, x2, y2)
             dirty = True
+            _refresh(x1, y1, x2, y2)
 
         logo_start = None
-        disp_img[:]=cv2.resize(main_img, None, fx=scale, fy=scale)
-        cv2.imshow("Image Editor", disp_img)
+        cv2.imshow(WIN, disp_img)
+
+def _show_changed(rect):
+    if rect is not None:
+        _refresh(*rect)
+        cv2.imshow(WIN, disp_img)
+
+def _undo():
+    _show_changed(history.undo(main_img))
+
+def _redo():
+    _show_changed(history.redo(main_img))
+
+def _wait_for_esc():
+    """
+    Throttled event loop: returns on Esc or when the window is closed.
+    z / y undo and redo the last edit without leaving the window.
+    """
+    while True:
+        key = cv2.waitKey(WAIT_MS) & 0xFF
+        if key == 27 or cv2.getWindowProperty(WIN, cv2.WND_PROP_VISIBLE) < 1:
+            break
+        if key == ord('z'):
+            _undo()
+        elif key == ord('y'):
+            _redo()
 
 # =============================
 # MAIN LAUNCH FUNCTION
 # =============================
-def launch_logo_editor(image_path: str):
-    global main_img, disp_img, scale, dirty, erase_start, logo_start, logo_img
+def launch_logo_editor(image_path: str, img=None, reload=None):
+    """
+    Edit `image_path`, or an already-loaded page `img` (then image_path
+    only names the output and `reload()` re-creates the page if Reset
+    needs more history than was kept).  Saves <stem>_logo<ext>.
+    """
+    global main_img, disp_img, scale, dirty, erase_start, logo_start, logo
 
     if not image_path: return None
-    main_img = cv2.imread(image_path)
+    reload = reload or (lambda: cv2.imread(image_path))
+    main_img = img if img is not None else reload()
     if main_img is None: return None
 
     disp_img, scale = _resize_for_display(main_img)
+    history.clear()
 
     while True:
         dirty = False
-        cv2.namedWindow("Image Editor")
-        cv2.setMouseCallback("Image Editor", _erase_cb)
-        cv2.imshow("Image Editor", disp_img)
-        while cv2.waitKey(1) != 27:
-            pass
+        cv2.namedWindow(WIN)
+        cv2.setMouseCallback(WIN, _erase_cb)
+        cv2.imshow(WIN, disp_img)
+        _wait_for_esc()
 
-        print("\n1 Erase more | 2 Insert logo | 3 Reset | 4 Save & Exit | 5 Exit")
+        print("\n1 Erase more | 2 Insert logo | 3 Reset | 4 Save & Exit | 5 Exit"
+              " | 6 Undo | 7 Redo   (z / y in the window)")
         ch = input("Choice: ").strip()
         if ch == '1':
             continue
         elif ch == '2':
             logo_path = _browse("Select Logo")
             if not logo_path: continue
-            logo_img = cv2.imread(logo_path)
-            if logo_img is None: continue
-            cv2.setMouseCallback("Image Editor", _logo_cb)
-            while cv2.waitKey(1) != 27:
-                pass
+            try:
+                logo = LogoCompositor(logo_path)   # once, with alpha
+            except ValueError:
+                continue
+            cv2.setMouseCallback(WIN, _logo_cb)
+            _wait_for_esc()
         elif ch == '3':
-            main_img = cv2.imread(image_path)
-            disp_img, scale = _resize_for_display(main_img)
+            if history.truncated:         # oldest steps evicted: only the source has them
+                main_img = reload()
+                disp_img, scale = _resize_for_display(main_img)
+                history.clear()
+            else:                         # undo all, no disk I/O
+                _show_changed(history.undo_all(main_img))
         elif ch == '4':
             stem, ext = os.path.splitext(image_path)
             out_path = stem + "_logo" + ext
@@ -221,6 +297,10 @@ def launch_logo_editor(image_path: str):
             return out_path
         elif ch == '5':
             break
+        elif ch == '6':
+            _undo()
+        elif ch == '7':
+            _redo()
 
     cv2.destroyAllWindows()
     return None
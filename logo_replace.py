@@ -0,0 +1,268 @@
+"""
+logo_replace.py
+---------------
+Headless bulk logo replacement (no Tk required): find the old logo on
+every page, erase it and composite the new logo into the same box.
+
+    python logo_replace.py INPUT [INPUT ...] -t old_logo.png -l new_logo.png -o out/
+
+The old logo is located with coarse-to-fine template matching: every
+candidate scale is tried on the coarsest level of a grayscale image
+pyramid that still leaves the template `min_side` px (cheap at 300 DPI),
+then the best hits are refined at full resolution in a small window
+around them with a few nearby scales.  Matches below
+`threshold` (normalised correlation, 0..1) are ignored; pages without a
+match are written unchanged and listed in the report.
+"""
+
+import argparse, json, os, sys, time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Tuple, Union
+
+import cv2, numpy as np
+
+from Blurkey import iter_pages, make_sink, map_pages, wanted_pages
+from batch import OutputCollision, expand_inputs, parse_pages
+from logo_compositor import LogoCompositor, load_logo
+from output_sinks import OutputEncoding, ENCODINGS
+
+COARSE_SLACK = 0.15          # coarse scores run lower: refine anything this close
+REFINE = (0.94, 0.97, 1.0, 1.03, 1.06)   # scale steps tried around a coarse hit
+ERASE_PAD = 2                # px (+1% of the box) erased around a match
+
+@dataclass
+class Match:
+    x1: int
+    y1: int
+    x2: int
+    y2: int
+    score: float
+    scale: float
+
+def _iou(a: Match, b: Match) -> float:
+    iw = min(a.x2, b.x2) - max(a.x1, b.x1); ih = min(a.y2, b.y2) - max(a.y1, b.y1)
+    if iw <= 0 or ih <= 0:
+        return 0.0
+    inter = iw * ih
+    return inter / ((a.x2-a.x1)*(a.y2-a.y1) + (b.x2-b.x1)*(b.y2-b.y1) - inter)
+
+class LogoMatcher:
+    """Multi-scale template matcher for one logo (picklable: plain arrays)."""
+    def __init__(self, template: Union[str, np.ndarray], *, threshold: float = 0.8,
+                 min_scale: float = 0.5, max_scale: float = 2.0, steps: int = 13,
+                 max_matches: int = 1, min_side: int = 20, max_level: int = 4):
+        bgr, _ = load_logo(template)
+        self.template = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY)
+        self.threshold, self.max_matches = threshold, max_matches
+        self.scales = np.geomspace(min_scale, max_scale, steps)
+        # per scale: the coarsest pyramid level keeping the template >= min_side
+        th, tw = self.template.shape
+        self._coarse = []
+        for s in self.scales:
+            lvl = int(np.clip(np.floor(np.log2(min(th, tw) * s / min_side)), 0, max_level))
+            t = self._resized(s / 2 ** lvl)
+            if t is not None:
+                self._coarse.append((s, lvl, t))
+
+    def _resized(self, s: float) -> Optional[np.ndarray]:
+        th, tw = self.template.shape
+        w, h = int(round(tw * s)), int(round(th * s))
+        if w < 4 or h < 4:
+            return None
+        return cv2.resize(self.template, (w, h),
+                          interpolation=cv2.INTER_AREA if s < 1 else cv2.INTER_LINEAR)
+
+    @staticmethod
+    def _match(img, tmpl):
+        if tmpl.shape[0] > img.shape[0] or tmpl.shape[1] > img.shape[1]:
+            return None
+        r = cv2.matchTemplate(img, tmpl, cv2.TM_CCOEFF_NORMED)
+        return np.nan_to_num(r, copy=False, nan=-1.0, posinf=-1.0, neginf=-1.0)
+
+    def _refine(self, gray, x: int, y: int, s: float, lvl: int) -> Optional[Match]:
+        H, W = gray.shape
+        best = None
+        for rs in (s * k for k in REFINE):
+            t = self._resized(rs)
+            if t is None:
+                continue
+            th, tw = t.shape
+            m = 2 ** (lvl + 1) + int(0.05 * max(th, tw)) + 2
+            X1, Y1 = max(x - m, 0), max(y - m, 0)
+            r = self._match(gray[Y1:min(y + th + m, H), X1:min(x + tw + m, W)], t)
+            if r is None:
+                continue
+            _, score, _, (dx, dy) = cv2.minMaxLoc(r)
+            if best is None or score > best.score:
+                best = Match(X1 + dx, Y1 + dy, X1 + dx + tw, Y1 + dy + th,
+                             round(float(score), 4), round(float(rs), 4))
+        return best
+
+    def find(self, img) -> List[Match]:
+        """Up to max_matches non-overlapping boxes scoring >= threshold."""
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+        pyramid = [gray]
+        for _ in range(max(lvl for _, lvl, _ in self._coarse)):
+            pyramid.append(cv2.pyrDown(pyramid[-1]))
+
+        cands = []                        # (score, scale, level, x, y) at that level
+        for s, lvl, t in self._coarse:
+            r = self._match(pyramid[lvl], t)
+            if r is None:
+                continue
+            th, tw = t.shape
+            for _ in range(self.max_matches):
+                _, score, _, (x, y) = cv2.minMaxLoc(r)
+                if score < self.threshold - COARSE_SLACK:
+                    break
+                cands.append((score, s, lvl, x, y))
+                r[max(y - th // 2, 0): y + th // 2 + 1, max(x - tw // 2, 0): x + tw // 2 + 1] = -1
+
+        matches = []
+        for _, s, lvl, x, y in sorted(cands, reverse=True)[: 4 * self.max_matches]:
+            m = self._refine(gray, x << lvl, y << lvl, s, lvl)
+            if m and m.score >= self.threshold and all(_iou(m, o) < 0.3 for o in matches):
+                matches.append(m)
+                if len(matches) == self.max_matches:
+                    break
+        return matches
+
+def replace_on_page(img, matcher: LogoMatcher, compositor: LogoCompositor) -> List[Match]:
+    """Find, erase and re-brand in place; returns the matches."""
+    matches = matcher.find(img)
+    h, w = img.shape[:2]
+    for m in matches:
+        pad = ERASE_PAD + max(m.x2 - m.x1, m.y2 - m.y1) // 100
+        img[max(m.y1 - pad, 0):min(m.y2 + pad, h),
+            max(m.x1 - pad, 0):min(m.x2 + pad, w)] = 255
+        compositor.place(img, m.x1, m.y1, m.x2, m.y2)
+    return matches
+
+# ------------------------------------------------------------------ #
+# Documents                                                          #
+# ------------------------------------------------------------------ #
+@dataclass
+class LogoReport:
+    source: str
+    outputs: List[str] = field(default_factory=list)
+    matches: Dict[int, List[Match]] = field(default_factory=dict)
+    unmatched: List[int] = field(default_factory=list)
+    errors: List[Tuple[int, str]] = field(default_factory=list)
+    elapsed_s: float = 0.0
+
+    def to_dict(self) -> dict:
+        d = asdict(self)
+        d["matches"] = {str(k): v for k, v in d["matches"].items()}
+        return d
+
+_worker: dict = {}                         # per process: set once by _init_worker
+
+def _init_worker(matcher, compositor):
+    _worker.update(matcher=matcher, compositor=compositor)
+
+def _page_job(file_path, page_no, codec):
+    """Worker side: render, re-brand and encode a single page."""
+    try:
+        for _, img in iter_pages(file_path, [page_no]):
+            matches = replace_on_page(img, _worker["matcher"], _worker["compositor"])
+            return codec.encode(img), matches
+        raise ValueError(f"Page {page_no} not found")
+    except Exception as e:
+        raise RuntimeError(f"{type(e).__name__}: {e}") from None
+
+def replace_logo_file(file_path: str, matcher: LogoMatcher, compositor: LogoCompositor, *,
+                      output_dir: str = "", output_format: str = "pdf",
+                      encoding: OutputEncoding = OutputEncoding(),
+                      page_numbers: Optional[List[int]] = None,
+                      workers: int = 1) -> LogoReport:
+    """
+    Re-brand the selected pages of `file_path`, streaming them to
+    <stem>_logo.pdf / .tif (or output_page_N images) in page order.
+    Pages are spread over a process pool when workers > 1; the matcher
+    and compositor are sent to each worker once.  Failed pages are left
+    out of the output and listed in the report.
+    """
+    rep = LogoReport(file_path)
+    sink = make_sink(file_path, output_dir, output_format, encoding, suffix="_logo")
+    t0 = time.perf_counter()
+    try:
+        for p, res, err in map_pages(_page_job, file_path,
+                                     wanted_pages(file_path, page_numbers), sink.codec,
+                                     workers=workers, initializer=_init_worker,
+                                     initargs=(matcher, compositor)):
+            if err is not None:
+                rep.errors.append((p, str(err)))
+                continue
+            enc, matches = res
+            sink.write(p, enc)
+            if matches:
+                rep.matches[p] = matches
+            else:
+                rep.unmatched.append(p)
+        rep.outputs = sink.close()
+    except BaseException:
+        sink.abort()
+        raise
+    rep.elapsed_s = round(time.perf_counter() - t0, 3)
+    return rep
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Replace a logo on every page.")
+    ap.add_argument("inputs", nargs="+", help="files, directories or globs")
+    ap.add_argument("-t", "--template", required=True, help="image of the old logo")
+    ap.add_argument("-l", "--logo", required=True, help="new logo (PNG alpha is kept)")
+    ap.add_argument("-o", "--out", required=True, help="output root directory")
+    ap.add_argument("-p", "--pages", type=parse_pages, default=None,
+                    help="comma-separated page numbers (default: all)")
+    ap.add_argument("-w", "--workers", type=int, default=1)
+    ap.add_argument("--threshold", type=float, default=0.8,
+                    help="minimum match score 0..1 (default 0.8)")
+    ap.add_argument("--min-scale", type=float, default=0.5,
+                    help="smallest logo size on the page vs the template")
+    ap.add_argument("--max-scale", type=float, default=2.0)
+    ap.add_argument("--max-matches", type=int, default=1, help="logos per page")
+    ap.add_argument("--feather", type=float, default=0.0,
+                    help="soften the new logo's edges (fraction of its width)")
+    ap.add_argument("--format", default="pdf", choices=["pdf", "tiff", "images"])
+    ap.add_argument("-e", "--encoding", default="jpeg", choices=ENCODINGS)
+    ap.add_argument("--jpeg-quality", type=int, default=95)
+    ap.add_argument("--report", help="write a JSON report of matches / unmatched pages")
+    ap.add_argument("-q", "--quiet", action="store_true")
+    args = ap.parse_args(argv)
+
+    matcher = LogoMatcher(args.template, threshold=args.threshold,
+                          min_scale=args.min_scale, max_scale=args.max_scale,
+                          max_matches=args.max_matches)
+    compositor = LogoCompositor(args.logo, feather=args.feather)
+    encoding = OutputEncoding(args.encoding, args.jpeg_quality)
+    log = (lambda *a: print(*a, flush=True)) if not args.quiet else (lambda *a: None)
+
+    try:
+        inputs = expand_inputs(args.inputs, exclude=args.out)
+    except OutputCollision as e:
+        ap.error(str(e))
+    reports, failed = [], 0
+    for src, rel in inputs:
+        out_dir = os.path.join(args.out, rel)
+        os.makedirs(out_dir, exist_ok=True)
+        try:
+            rep = replace_logo_file(src, matcher, compositor, output_dir=out_dir,
+                                    output_format=args.format, encoding=encoding,
+                                    page_numbers=args.pages, workers=args.workers)
+        except Exception as e:
+            failed += 1; log(f"FAIL  {src}: {e}")
+            continue
+        reports.append(rep.to_dict())
+        log(f"done  {src}: {len(rep.matches)} matched, "
+            f"{len(rep.unmatched)} without a match, {len(rep.errors)} errors "
+            f"in {rep.elapsed_s:.1f}s")
+        if rep.unmatched:
+            log(f"      no match on pages {', '.join(map(str, rep.unmatched))}")
+        failed += bool(rep.errors)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=1)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,19 +2,27 @@
 main_gui.py  – v2
 • Upload PDF or image.
 • If Logo-mode chosen:
-    – Every PDF page saved in current working directory
-      as  <pdfname>_pageNNN.png
-    – User picks a page, edits logo, saves as *_logo.png
-      Repeats until user quits.
+    – Page gallery: low-DPI previews rendered in the background and
+      cached on disk (see thumbnails.py)
+    – User clicks a page; only that page is rendered at full resolution,
+      edited and saved as <pdfname>_pageNNN_logo.png. Repeats until the
+      gallery is closed.
 • If Blur-mode chosen:
-    – Normal keyword / address blur workflow.
+    – Normal keyword / address blur workflow, run on a background
+      worker with per-page progress, pages/s, ETA and Cancel.
 """
 
 import tkinter as tk
 from tkinter import filedialog, messagebox, simpledialog, ttk
 import os
-from Blurkey import process_file, load_pages
+import base64, multiprocessing, queue, threading, time
+from Blurkey import (process_file, iter_pages, page_count, MASK_MODES, JobCancelled,
+                     TIFF_EXTS)
+from ocr_cache import OcrCache
+from ocr_prep import OcrConfig
+from metrics import JobMetrics
 from logo_editor import launch_logo_editor
+from thumbnails import ThumbnailCache, MAX_SIDE as THUMB_SIDE
 
 # ─────────── Globals & LED helpers ────────────
 selected_file_path = None
@@ -48,7 +56,7 @@ def upload_file():
     global selected_file_path
     path = filedialog.askopenfilename(
         title="Select PDF or Image",
-        filetypes=[("PDF or Image files", "*.pdf *.jpg *.jpeg *.png *.tiff")])
+        filetypes=[("PDF or Image files", "*.pdf *.jpg *.jpeg *.png *.tif *.tiff")])
     if not path:
         return
 
@@ -62,33 +70,124 @@ def upload_file():
 
     if logo_mode:
         iterative_logo_flow(path)
-        reset_ui()
     # else: stay on GUI for keyword blur
 
 # ─────────── Iterative logo flow ────────────
+GALLERY_COLS = 4
+gallery = None                      # dict while the page gallery is open
+
 def iterative_logo_flow(src_path):
     """
-    • Save every PDF page as PNG in CWD (or take single image).
-    • Let user keep picking images until they quit.
+    • PDFs / multi-page TIFFs open a page gallery: low-DPI previews are
+      rendered in the background (and cached on disk); only the page the
+      user clicks is rasterised at full resolution, then edited.
+    • Single images: let user keep picking images until they quit.
     """
-    # Prepare list of images in current dir
-    cwd = os.getcwd()
-    candidate_images = []
-
-    if src_path.lower().endswith(".pdf"):
-        base = os.path.splitext(os.path.basename(src_path))[0]
-        pages = load_pages(src_path)
-        for idx, page in enumerate(pages, 1):
-            img_name = f"{base}_page{idx:03}.png"
-            img_path = os.path.join(cwd, img_name)
-            if not os.path.exists(img_path):   # avoid re-writing if it exists
-                import cv2
-                cv2.imwrite(img_path, page)
-            candidate_images.append(img_path)
+    if not src_path.lower().endswith(".pdf") and page_count(src_path) <= 1:
+        logo_edit_loop(os.getcwd()); reset_ui()
+        return
+    open_gallery(src_path)
+
+def open_gallery(src_path):
+    global gallery
+    win = tk.Toplevel(root); win.title(f"Pages – {os.path.basename(src_path)}")
+    canvas = tk.Canvas(win, width=GALLERY_COLS * (THUMB_SIDE + 14), height=620)
+    bar = ttk.Scrollbar(win, orient="vertical", command=canvas.yview)
+    inner = tk.Frame(canvas)
+    inner.bind("<Configure>", lambda e: canvas.config(scrollregion=canvas.bbox("all")))
+    canvas.create_window((0, 0), window=inner, anchor="nw")
+    canvas.config(yscrollcommand=bar.set)
+    canvas.pack(side="left", fill="both", expand=True); bar.pack(side="right", fill="y")
+
+    blank = tk.PhotoImage(width=THUMB_SIDE, height=THUMB_SIDE)   # placeholder
+    buttons = {}
+    for i in range(page_count(src_path)):
+        b = tk.Button(inner, text=f"Page {i+1}", image=blank, compound="top",
+                      command=lambda p=i+1: pick_page(p))
+        b.grid(row=i // GALLERY_COLS, column=i % GALLERY_COLS, padx=3, pady=3)
+        buttons[i+1] = b
+    gallery = {"src": src_path, "win": win, "buttons": buttons, "photos": {},
+               "blank": blank, "pending": None, "rendering": False}
+    win.protocol("WM_DELETE_WINDOW", close_gallery)
+    load_thumbnails()
+
+def load_thumbnails():
+    """Render the previews not shown yet on the background worker."""
+    if gallery is None:
+        return
+    todo = [p for p in gallery["buttons"] if p not in gallery["photos"]]
+    if not todo:
+        return
+    src = gallery["src"]
+
+    def work(emit, cancel):
+        emit(("total", len(todo)))
+        for p, png in ThumbnailCache().iter_thumbnails(src, todo, cancel):
+            emit(("item", (p, png))); emit(("page", p))
+        if cancel.is_set():
+            raise JobCancelled(src)
+
+    start_job(work, lambda _: None, label="Loading previews",
+              on_item=show_thumbnail, on_end=after_thumbnails)
+
+def show_thumbnail(item):
+    p, png = item
+    if gallery is None:
+        return
+    photo = tk.PhotoImage(data=base64.b64encode(png))
+    gallery["photos"][p] = photo                    # keep a reference for Tk
+    gallery["buttons"][p].config(image=photo)
+
+def after_thumbnails():
+    if gallery is not None and gallery["pending"]:
+        p, gallery["pending"] = gallery["pending"], None
+        edit_page(p)
+
+def pick_page(p):
+    if gallery["rendering"]:
+        return
+    if job:                          # previews still loading: pause them first
+        gallery["pending"] = p; cancel_job()
     else:
-        candidate_images.append(src_path)
+        edit_page(p)
+
+def edit_page(p):
+    """Rasterise page p at full resolution just in time and open the editor."""
+    src = gallery["src"]
+    base = os.path.splitext(os.path.basename(src))[0]
+    name = os.path.join(os.getcwd(), f"{base}_page{p:03}.png")   # saved as *_logo.png
+    render = lambda: next(iter_pages(src, [p]))[1]
+
+    def work(emit, cancel):
+        emit(("total", 1)); img = render(); emit(("page", p))
+        return img
+
+    def done(img):
+        if gallery is None:              # closed while the page was rendering
+            return
+        out_path = launch_logo_editor(name, img=img, reload=render)
+        if out_path:
+            messagebox.showinfo("Saved",
+                                f"Logo-added image saved as:\n{os.path.basename(out_path)}")
+
+    def end():
+        if gallery is not None:
+            gallery["rendering"] = False
+        load_thumbnails()                # resume the previews, if any left
 
-    # Iterative editing loop
+    gallery["rendering"] = True
+    start_job(work, done, label=f"Rendering page {p}", on_end=end)
+
+def close_gallery():
+    global gallery
+    if gallery is None:
+        return
+    g, gallery = gallery, None
+    cancel_job()
+    g["win"].destroy()
+    reset_ui()
+
+def logo_edit_loop(cwd):
     while True:
         img = filedialog.askopenfilename(
             title="Choose image for logo editing",
@@ -121,9 +220,102 @@ def ask_page_numbers():
         messagebox.showerror("Invalid", "Enter e.g. 1,2,5")
         return ask_page_numbers()
 
+# ─────────── Background worker ────────────
+# Jobs run on a thread; they only talk to Tk through `events`, which the
+# main loop drains every POLL_MS.  Cancel stops at the next page boundary.
+POLL_MS = 100
+events  = queue.Queue()
+job     = None                      # dict while a job is running
+
+def start_job(target, on_done, label="Processing", on_end=None, on_item=None):
+    """
+    Run target(emit, cancel) in the background; on_done(result) on the UI
+    thread.  emit(("item", x)) hands x to on_item on the UI thread.
+    """
+    global job, processing
+    cancel = threading.Event()
+    def runner():
+        try:
+            events.put(("done", target(events.put, cancel)))
+        except JobCancelled:
+            events.put(("cancelled", None))
+        except Exception as e:
+            events.put(("error", e))
+
+    job = {"cancel": cancel, "on_done": on_done, "on_end": on_end,
+           "on_item": on_item, "label": label,
+           "total": None, "done": 0, "t0": time.perf_counter()}
+    processing = True
+    set_busy(True)
+    set_led("green", blink=True)
+    progress.config(value=0, maximum=1)
+    lbl_status.config(text=f"{label}…")
+    threading.Thread(target=runner, daemon=True).start()
+    root.after(POLL_MS, poll_events)
+
+def cancel_job():
+    if job:
+        job["cancel"].set()
+        lbl_status.config(text="Cancelling after the current page…")
+
+def _update_progress():
+    done, total = job["done"], job["total"]
+    elapsed = time.perf_counter() - job["t0"]
+    rate = done / elapsed if elapsed and done else 0.0
+    text = f"{job['label']}: {done}/{total if total is not None else '?'} pages"
+    if rate:
+        text += f"  {rate:.2f} pages/s"
+        if total:
+            text += f"  ETA {max(total - done, 0) / rate:.0f}s"
+    if total:
+        progress.config(maximum=total, value=done)
+    lbl_status.config(text=text)
+
+def poll_events():
+    global job, processing
+    while True:
+        try:
+            kind, payload = events.get_nowait()
+        except queue.Empty:
+            break
+        if kind == "total":
+            job["total"] = payload; _update_progress()
+        elif kind == "page":
+            job["done"] += 1; _update_progress()
+        elif kind == "item":
+            if job["on_item"]: job["on_item"](payload)
+        elif kind == "metrics":                      # JobMetrics event
+            ev = payload["event"]
+            if ev == "start":
+                job["total"] = payload["pages"]; _update_progress()
+            elif ev in ("page", "page_error"):
+                job["done"] += 1; _update_progress()
+            elif ev == "stage" and payload["page"]:
+                lbl_status.config(text=f"{job['label']}: page {payload['page']} "
+                                       f"– {payload['stage']}")
+        else:                                         # done / cancelled / error
+            finished, job = job, None
+            processing = False
+            set_busy(False)
+            if kind == "done":
+                set_led("blue"); finished["on_done"](payload)
+            elif kind == "cancelled":
+                set_led("gray"); lbl_status.config(text="Cancelled.")
+            else:
+                set_led("red"); messagebox.showerror("Error", str(payload))
+            if finished["on_end"]:
+                finished["on_end"]()
+            return
+    root.after(POLL_MS, poll_events)
+
+def set_busy(busy):
+    state = "disabled" if busy else "normal"
+    for b in (btn_upload, btn_address, btn_generic):
+        b.config(state=state)
+    btn_cancel.config(state="normal" if busy else "disabled")
+
 # ─────────── Blur workflow ────────────
 def run_process(address_mode=False):
-    global processing
     if not selected_file_path:
         messagebox.showwarning("No File", "Upload a PDF or image first.")
         return
@@ -133,53 +325,95 @@ def run_process(address_mode=False):
         messagebox.showwarning("No Keywords", "Enter at least one keyword.")
         return
 
-    try:
-        processing = True
-        set_led("green", blink=True)
-        pages     = ask_page_numbers()
-        mask_mode = mask_mode_var.get()
+    pages     = ask_page_numbers()
+    src       = selected_file_path
+    out_fmt   = ("pdf" if src.lower().endswith(".pdf") else
+                 "tiff" if src.lower().endswith(TIFF_EXTS) else "images")
+    options   = dict(mask_mode=mask_mode_var.get(), page_numbers=pages,
+                     address_mode=address_mode, workers=workers_var.get(),
+                     ocr=OcrConfig(target_dpi=ocr_dpi_var.get(),
+                                   grayscale=grayscale_var.get()),
+                     text_layer=text_layer_var.get(),
+                     output_format=out_fmt)
 
-        process_file(selected_file_path, keywords,
-                     mask_mode=mask_mode, page_numbers=pages,
-                     address_mode=address_mode)
+    def work(emit, cancel):
+        metrics = JobMetrics(callbacks=[lambda e: emit(("metrics", e))])
+        outputs = process_file(src, keywords, ocr_cache=OcrCache(),
+                               metrics=metrics, cancel=cancel, **options)
+        return outputs, metrics.report()
 
-        set_led("blue")
-        if not messagebox.askyesno("Done", "Processing finished. Another file?"):
+    def done(result):
+        outputs, rep = result
+        where = outputs[0] if len(outputs) == 1 else f"{len(outputs)} files"
+        stats = (f"{rep['pages']} pages in {rep['elapsed_s']:.1f}s, "
+                 f"{rep['matches']} matches masked")
+        lbl_status.config(text=stats)
+        if not messagebox.askyesno("Done", f"Processing finished:\n{where}\n{stats}\n\nAnother file?"):
             root.destroy()
         else:
             reset_ui()
-    except Exception as e:
-        set_led("red"); messagebox.showerror("Error", str(e))
-    finally:
-        processing = False
+
+    start_job(work, done)
 
 # ─────────── GUI layout ────────────
-root = tk.Tk(); root.title("Document Processor"); root.geometry("520x520")
+# Guarded so process-pool workers (spawned on Windows) don't rebuild the UI.
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    root = tk.Tk(); root.title("Document Processor"); root.geometry("520x620")
+
+    btn_upload = tk.Button(root, text="Upload PDF / Image", width=30,
+                           command=upload_file)
+    btn_upload.pack(pady=10)
+
+    lbl_file = tk.Label(root, text="No file selected", fg="gray"); lbl_file.pack()
+
+    tk.Label(root, text="Enter Keywords (one per line):").pack(pady=(10,0))
+    txt_keywords = tk.Text(root, height=6, width=54); txt_keywords.pack()
+
+    frame = tk.Frame(root); frame.pack(pady=10)
+    tk.Label(frame, text="Mask Mode:").grid(row=0, column=0, padx=(0,5))
+    mask_mode_var = tk.StringVar(value="blur")
+    mask_mode_menu = ttk.Combobox(frame, textvariable=mask_mode_var,
+                                  values=list(MASK_MODES),
+                                  state="readonly", width=11)
+    mask_mode_menu.grid(row=0, column=1)
 
-tk.Button(root, text="Upload PDF / Image", width=30,
-          command=upload_file).pack(pady=10)
+    tk.Label(frame, text="Workers:").grid(row=1, column=0, padx=(0,5), pady=(5,0))
+    workers_var = tk.IntVar(value=1)
+    tk.Spinbox(frame, from_=1, to=os.cpu_count() or 1, textvariable=workers_var,
+               width=5, state="readonly").grid(row=1, column=1, sticky="w", pady=(5,0))
 
-lbl_file = tk.Label(root, text="No file selected", fg="gray"); lbl_file.pack()
+    tk.Label(frame, text="OCR DPI:").grid(row=2, column=0, padx=(0,5), pady=(5,0))
+    ocr_dpi_var = tk.IntVar(value=300)
+    ttk.Combobox(frame, textvariable=ocr_dpi_var, values=[150, 200, 300],
+                 state="readonly", width=5).grid(row=2, column=1, sticky="w", pady=(5,0))
 
-tk.Label(root, text="Enter Keywords (one per line):").pack(pady=(10,0))
-txt_keywords = tk.Text(root, height=6, width=54); txt_keywords.pack()
+    text_layer_var = tk.BooleanVar(value=False)
+    tk.Checkbutton(frame, text="Use PDF text layer (skip OCR for digital PDFs)",
+                   variable=text_layer_var).grid(row=3, column=0, columnspan=3,
+                                                 sticky="w", pady=(5,0))
+    grayscale_var = tk.BooleanVar(value=False)
+    tk.Checkbutton(frame, text="OCR a grayscale copy (faster on colour scans)",
+                   variable=grayscale_var).grid(row=4, column=0, columnspan=3,
+                                                sticky="w", pady=(5,0))
 
-frame = tk.Frame(root); frame.pack(pady=10)
-tk.Label(frame, text="Mask Mode:").grid(row=0, column=0, padx=(0,5))
-mask_mode_var = tk.StringVar(value="blur")
-mask_mode_menu = ttk.Combobox(frame, textvariable=mask_mode_var,
-                              values=["blur", "replace"],
-                              state="readonly", width=11)
-mask_mode_menu.grid(row=0, column=1)
+    led_canvas = tk.Canvas(frame, width=20, height=20, bg="white", highlightthickness=0)
+    led_circle = led_canvas.create_oval(2,2,18,18, fill="gray"); led_canvas.grid(row=0,column=2,padx=(10,0))
 
-led_canvas = tk.Canvas(frame, width=20, height=20, bg="white", highlightthickness=0)
-led_circle = led_canvas.create_oval(2,2,18,18, fill="gray"); led_canvas.grid(row=0,column=2,padx=(10,0))
+    btn_address = tk.Button(root, text="Address Blur", width=20,
+                            bg="#2196F3", fg="white",
+                            command=lambda: run_process(address_mode=True))
+    btn_address.pack(pady=(15,5))
+    btn_generic = tk.Button(root, text="Generic Blur", width=20,
+                            bg="#4CAF50", fg="white",
+                            command=lambda: run_process(address_mode=False))
+    btn_generic.pack(pady=5)
 
-tk.Button(root, text="Address Blur", width=20,
-          bg="#2196F3", fg="white",
-          command=lambda: run_process(address_mode=True)).pack(pady=(15,5))
-tk.Button(root, text="Generic Blur", width=20,
-          bg="#4CAF50", fg="white",
-          command=lambda: run_process(address_mode=False)).pack(pady=5)
+    progress = ttk.Progressbar(root, length=400, mode="determinate")
+    progress.pack(pady=(10,0))
+    lbl_status = tk.Label(root, text="", fg="gray"); lbl_status.pack(pady=(5,0))
+    btn_cancel = tk.Button(root, text="Cancel", width=12, state="disabled",
+                           command=cancel_job)
+    btn_cancel.pack(pady=5)
 
-root.mainloop()
+    root.mainloop()
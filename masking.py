@@ -0,0 +1,86 @@
+"""
+masking.py
+----------
+Batched masking: take every box found on a page, merge overlapping /
+adjacent rectangles, then mask each merged region once.
+
+Modes
+  blur     : downscale -> Gaussian -> upscale; visually matches the old
+             full-resolution 45x45 Gaussian at a fraction of the cost
+  replace  : white box with a single "MASKED" label per merged region
+  pixelate : coarse mosaic
+  fill     : solid black box
+"""
+
+import cv2
+from typing import Iterable, List, Tuple
+
+Box = Tuple[int, int, int, int]           # x1, y1, x2, y2 (exclusive)
+
+MASK_MODES = ("blur", "replace", "pixelate", "fill")
+
+BLUR_SIGMA     = 0.3 * ((45 - 1) * 0.5 - 1) + 0.8   # sigma cv2 picks for ksize 45
+BLUR_DOWNSCALE = 4
+PIXEL_BLOCK    = 12
+
+def merge_boxes(boxes: Iterable[Box], gap: int = 2) -> List[Box]:
+    """Union rectangles that overlap or lie within `gap` px of each other."""
+    merged: List[List[int]] = []
+    for b in sorted(boxes, key=lambda b: (b[1], b[0])):
+        cur = list(b)
+        changed = True
+        while changed:                    # absorb everything cur now touches
+            changed = False
+            for m in merged:
+                if (cur[0] <= m[2] + gap and m[0] <= cur[2] + gap and
+                        cur[1] <= m[3] + gap and m[1] <= cur[3] + gap):
+                    cur = [min(cur[0], m[0]), min(cur[1], m[1]),
+                           max(cur[2], m[2]), max(cur[3], m[3])]
+                    merged.remove(m); changed = True
+                    break
+        merged.append(cur)
+    return [tuple(m) for m in merged]
+
+def _clip(img, box: Box):
+    h, w = img.shape[:2]
+    x1, y1, x2, y2 = box
+    return max(x1, 0), max(y1, 0), min(x2, w), min(y2, h)
+
+def _blur(roi):
+    h, w = roi.shape[:2]
+    f = BLUR_DOWNSCALE if min(h, w) >= 4 * BLUR_DOWNSCALE else 1
+    small = cv2.resize(roi, (max(w // f, 1), max(h // f, 1)), interpolation=cv2.INTER_AREA)
+    small = cv2.GaussianBlur(small, (0, 0), BLUR_SIGMA / f)
+    return cv2.resize(small, (w, h), interpolation=cv2.INTER_LINEAR)
+
+def _pixelate(roi):
+    h, w = roi.shape[:2]
+    small = cv2.resize(roi, (max(w // PIXEL_BLOCK, 1), max(h // PIXEL_BLOCK, 1)),
+                       interpolation=cv2.INTER_AREA)
+    return cv2.resize(small, (w, h), interpolation=cv2.INTER_NEAREST)
+
+def mask_boxes(img, boxes: Iterable[Box], *, mode="blur", merge=True) -> List[Box]:
+    """Mask all `boxes` on `img` in place; returns the regions actually masked."""
+    if mode not in MASK_MODES:
+        raise ValueError(f"Unknown mask mode {mode!r}")
+    regions = merge_boxes(boxes) if merge else list(boxes)
+    done = []
+    for box in regions:
+        x1, y1, x2, y2 = _clip(img, box)
+        if x2 <= x1 or y2 <= y1:
+            continue
+        roi = img[y1:y2, x1:x2]
+        if mode == "blur":
+            roi[:] = _blur(roi)
+        elif mode == "pixelate":
+            roi[:] = _pixelate(roi)
+        elif mode == "fill":
+            roi[:] = 0
+        else:  # replace
+            roi[:] = 255
+            cv2.putText(img, "MASKED", (x1, y1+25),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0,0,0), 2)
+        done.append((x1, y1, x2, y2))
+    return done
+
+__all__ = ["mask_boxes", "merge_boxes", "MASK_MODES"]
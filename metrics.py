@@ -0,0 +1,155 @@
+"""
+metrics.py
+----------
+Per-stage timing and counters for redaction jobs.
+
+  PageMetrics : one page - stage seconds + counters; plain data, so pool
+                workers can fill it in and send it back with the page.
+  JobMetrics  : aggregates pages, fans events out to subscribed callbacks
+                and renders a structured JSON report.
+
+Stages: render, ocr (or text_layer), match, mask, encode, write.
+Events passed to callbacks are dicts with an "event" key:
+  {"event": "start", "source": path, "pages": total}
+  {"event": "stage", "page": n, "stage": name}      (serial runs only)
+  {"event": "page", "page": n, ...PageMetrics fields}
+  {"event": "page_error", "page": n, "error": "..."}
+  {"event": "job", ...report}
+"""
+
+import json, sys, time, tracemalloc
+from contextlib import contextmanager, nullcontext
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:                     # Windows
+    resource = None
+
+STAGES = ("render", "ocr", "text_layer", "match", "mask", "encode", "write")
+
+@dataclass
+class PageMetrics:
+    page: int = 0
+    stages: Dict[str, float] = field(default_factory=dict)
+    tokens: int = 0
+    matches: int = 0
+    masked_px: int = 0
+    bytes_written: int = 0
+    peak_bytes: Optional[int] = None    # tracemalloc peak while on this page
+
+    @contextmanager
+    def stage(self, name: str):
+        listener = getattr(self, "_listener", None)   # set in-process only
+        if listener is not None:
+            listener(self.page, name)
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - t
+
+def timed(pm: Optional[PageMetrics], name: str):
+    """`with timed(pm, "ocr"):` - a no-op when metrics are off."""
+    return pm.stage(name) if pm is not None else nullcontext()
+
+def start_memory_tracking() -> None:
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+
+def memory_peak() -> Optional[int]:
+    return tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else None
+
+def _max_rss_bytes() -> Optional[int]:
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+class JobMetrics:
+    def __init__(self, callbacks: Optional[List[Callable[[dict], None]]] = None,
+                 track_memory: bool = False):
+        self.callbacks = list(callbacks or [])
+        self.track_memory = track_memory
+        self.pages: List[PageMetrics] = []
+        self.errors: List[Dict] = []
+        self.source: Optional[str] = None
+        self._t0 = self._t1 = None
+
+    def subscribe(self, cb: Callable[[dict], None]) -> None:
+        self.callbacks.append(cb)
+
+    def _emit(self, event: dict) -> None:
+        for cb in self.callbacks:
+            cb(event)
+
+    # ---- job lifecycle (called by process_file) ----
+    def start(self, source: str, total: Optional[int] = None) -> None:
+        self.source = source
+        self._t0 = time.perf_counter()
+        if self.track_memory:
+            start_memory_tracking()
+        self._emit({"event": "start", "source": source, "pages": total})
+
+    def new_page(self) -> PageMetrics:
+        pm = PageMetrics()
+        if self.callbacks:
+            pm._listener = lambda page, stage: self._emit(
+                {"event": "stage", "page": page, "stage": stage})
+        return pm
+
+    def add_page(self, pm: PageMetrics) -> None:
+        self.pages.append(pm)
+        self._emit(dict(asdict(pm), event="page"))
+
+    def add_error(self, page_no: int, exc: Exception) -> None:
+        self.errors.append({"page": page_no, "error": f"{type(exc).__name__}: {exc}"})
+        self._emit(dict(self.errors[-1], event="page_error"))
+
+    def finish(self) -> None:
+        self._t1 = time.perf_counter()
+        self._emit(dict(self.report(), event="job"))
+
+    # ---- reporting ----
+    @property
+    def elapsed(self) -> float:
+        if self._t0 is None:
+            return 0.0
+        return (self._t1 or time.perf_counter()) - self._t0
+
+    def report(self) -> dict:
+        stages: Dict[str, float] = {}
+        for pm in self.pages:
+            for k, v in pm.stages.items():
+                stages[k] = stages.get(k, 0.0) + v
+        n = len(self.pages)
+        peaks = [pm.peak_bytes for pm in self.pages if pm.peak_bytes is not None]
+        rep = {
+            "source": self.source,
+            "elapsed_s": round(self.elapsed, 4),
+            "pages": n,
+            "pages_per_s": round(n / self.elapsed, 3) if self.elapsed else None,
+            "tokens": sum(pm.tokens for pm in self.pages),
+            "matches": sum(pm.matches for pm in self.pages),
+            "masked_px": sum(pm.masked_px for pm in self.pages),
+            "bytes_written": sum(pm.bytes_written for pm in self.pages),
+            "stage_s": {k: round(v, 4) for k, v in stages.items()},
+            "errors": self.errors,
+            "per_page": [asdict(pm) for pm in self.pages],
+        }
+        if self.track_memory:
+            peaks.append(memory_peak() or 0)
+            rep["peak_traced_bytes"] = max(peaks)
+            rep["max_rss_bytes"] = _max_rss_bytes()
+        return rep
+
+    def to_json(self, path: Optional[str] = None, **kw) -> str:
+        text = json.dumps(self.report(), indent=kw.pop("indent", 1), **kw)
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+        return text
+
+__all__ = ["JobMetrics", "PageMetrics", "timed", "STAGES"]
@@ -0,0 +1,154 @@
+"""
+ocr_backends.py
+---------------
+OCR engines behind one call: image_to_data(img, lang, config) -> dict in
+pytesseract's Output.DICT shape, so both detectors work unchanged.
+
+  tesserocr   : Tesseract C API (pip install tesserocr).  Long-lived
+                engines per (lang, config), checked out for one call and
+                put back - the language model is loaded once per engine
+                and pages are fed as in-memory buffers.
+  pytesseract : spawns the tesseract CLI per page (temp file + TSV).
+                Always available; used as the fallback.
+
+get_backend("auto") picks tesserocr when it is importable.  The two do
+not produce identical boxes, so cached results are keyed by backend_name.
+"""
+
+import os, shlex, threading
+import cv2, numpy as np, pytesseract
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+try:
+    import tesserocr
+except ImportError:                      # optional dependency
+    tesserocr = None
+
+BACKENDS = ("auto", "tesserocr", "pytesseract")
+
+_TSV_COLS = ("level", "page_num", "block_num", "par_num", "line_num", "word_num",
+             "left", "top", "width", "height", "conf", "text")
+
+def parse_tsv(tsv: str, header: bool = False) -> Dict[str, List]:
+    """Tesseract TSV -> image_to_data dict (numeric columns as int)."""
+    data = {c: [] for c in _TSV_COLS}
+    rows = tsv.splitlines()[1 if header else 0:]
+    for row in rows:
+        cells = row.split("\t")
+        if len(cells) < len(_TSV_COLS) - 1:
+            continue
+        if len(cells) < len(_TSV_COLS):
+            cells.append("")
+        for c, v in zip(_TSV_COLS[:-1], cells):
+            data[c].append(int(float(v)))
+        data["text"].append(cells[len(_TSV_COLS) - 1])
+    return data
+
+class PytesseractBackend:
+    name = "pytesseract"
+
+    def image_to_data(self, img, lang: Optional[str] = None, config: str = ""):
+        return pytesseract.image_to_data(img, lang=lang, config=config,
+                                         output_type=pytesseract.Output.DICT)
+
+class TesserocrBackend:
+    """
+    Keeps a pool of idle PyTessBaseAPI engines per (lang, config).  An
+    engine is not thread-safe, so each call checks one out and returns it;
+    the pool only grows to the number of concurrent calls (tiled OCR runs
+    on short-lived thread pools, so engines are not tied to a thread).
+    """
+    name = "tesserocr"
+
+    def __init__(self):
+        if tesserocr is None:
+            raise RuntimeError("tesserocr is not installed")
+        self._lock = threading.Lock()
+        self._idle: Dict[tuple, list] = {}
+        self._all = []
+
+    @staticmethod
+    def _parse_config(config):
+        """CLI flags -> PyTessBaseAPI kwargs + variables; rejects the rest."""
+        kwargs, variables = {"psm": tesserocr.PSM.AUTO}, {}
+        args = shlex.split(config)
+        if len(args) % 2:
+            raise ValueError(f"tesserocr: every flag needs a value in {config!r}")
+        for a, v in zip(args[::2], args[1::2]):
+            if a == "--psm":
+                kwargs["psm"] = int(v)
+            elif a == "--oem":
+                kwargs["oem"] = int(v)
+            elif a == "--tessdata-dir":
+                kwargs["path"] = v
+            elif a == "--dpi":
+                variables["user_defined_dpi"] = v
+            elif a == "-c" and "=" in v:
+                k, v = v.split("=", 1); variables[k] = v
+            else:                         # e.g. -l: pass the language as `lang`
+                raise ValueError(f"tesserocr backend does not support {a} {v}")
+        return kwargs, variables
+
+    def _new_engine(self, lang, config):
+        kwargs, variables = self._parse_config(config)
+        api = tesserocr.PyTessBaseAPI(lang=lang, **kwargs)
+        for k, v in variables.items():
+            api.SetVariable(k, v)
+        with self._lock:
+            self._all.append(api)
+        return api
+
+    @contextmanager
+    def _engine(self, lang, config):
+        key = (lang or "eng", config)
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            api = idle.pop() if idle else None
+        if api is None:
+            api = self._new_engine(*key)
+        try:
+            yield api
+        finally:
+            api.Clear()
+            with self._lock:
+                self._idle.setdefault(key, []).append(api)
+
+    def image_to_data(self, img, lang: Optional[str] = None, config: str = ""):
+        if img.ndim == 3:
+            img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        img = np.ascontiguousarray(img)
+        h, w = img.shape[:2]
+        bpp = 1 if img.ndim == 2 else img.shape[2]
+        with self._engine(lang, config) as api:
+            api.SetImageBytes(img.tobytes(), w, h, bpp, w * bpp)
+            api.Recognize()
+            return parse_tsv(api.GetTSVText(0))
+
+    def close(self):
+        with self._lock:
+            for api in self._all:
+                api.End()
+            self._all.clear(); self._idle.clear()
+
+_instances = {}                          # per process: pool workers get their own
+if hasattr(os, "register_at_fork"):      # never share a C engine across fork()
+    os.register_at_fork(after_in_child=_instances.clear)
+
+def backend_name(name: str = "auto") -> str:
+    """The backend get_backend(name) returns ("auto" resolved)."""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown OCR backend {name!r}")
+    if name == "auto":
+        return "tesserocr" if tesserocr is not None else "pytesseract"
+    return name
+
+def get_backend(name: str = "auto"):
+    name = backend_name(name)
+    if name not in _instances:
+        _instances[name] = (TesserocrBackend() if name == "tesserocr"
+                            else PytesseractBackend())
+    return _instances[name]
+
+__all__ = ["get_backend", "backend_name", "parse_tsv", "BACKENDS",
+           "PytesseractBackend", "TesserocrBackend"]
@@ -0,0 +1,51 @@
+"""
+ocr_cache.py
+------------
+Persistent on-disk cache for pytesseract.image_to_data results.
+Entries are keyed by a hash of the page pixels + OCR settings and stored
+as compressed columnar .npz files; total size is capped with LRU eviction
+(least-recently-read entries go first, see disk_cache.py).
+"""
+
+import hashlib, os
+import numpy as np
+from typing import Dict, List, Optional
+
+from disk_cache import DiskCache
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "blurkey", "ocr")
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+_TEXT_COLS = ("text",)
+
+def cache_key(img: np.ndarray, settings: str = "") -> str:
+    h = hashlib.sha1()
+    h.update(f"{img.shape}|{img.dtype}|{settings}|".encode())
+    h.update(np.ascontiguousarray(img).data)
+    return h.hexdigest()
+
+class OcrCache(DiskCache):
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        super().__init__(cache_dir, max_bytes, ".npz")
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + ".npz")
+
+    def get(self, key: str) -> Optional[Dict[str, List]]:
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as z:
+                data = {c: z[c].tolist() for c in z.files}
+        except (OSError, ValueError, KeyError):
+            return None
+        self._touch(path)
+        return data
+
+    def put(self, key: str, data: Dict[str, List]) -> None:
+        cols = {c: (np.asarray(v, dtype=np.str_) if c in _TEXT_COLS
+                    else np.asarray(v, dtype=np.int32))
+                for c, v in data.items()}
+        self._store(self._path(key), lambda f: np.savez_compressed(f, **cols))
+
+__all__ = ["OcrCache", "cache_key", "DEFAULT_CACHE_DIR"]
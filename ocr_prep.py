@@ -0,0 +1,80 @@
+"""
+ocr_prep.py
+-----------
+OCR pre-processing decoupled from the page that gets masked.
+Tesseract can run on a grayscale / binarised / downscaled copy of the
+page; the word boxes are then mapped back to full-resolution coordinates
+so masking still hits the original pixels precisely.
+"""
+
+import cv2, numpy as np
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional, Tuple
+
+BOX_COLS = ("left", "top", "width", "height")
+
+@dataclass(frozen=True)
+class OcrConfig:
+    source_dpi: Optional[int] = None      # resolution of the pages; None = unknown
+    target_dpi: Optional[int] = None      # None = OCR at source resolution
+    grayscale: bool = False
+    binarize: bool = False                # adaptive threshold (implies grayscale)
+    block_size: int = 31                  # adaptive threshold neighbourhood, px
+    lang: Optional[str] = None
+    config: str = ""                      # extra tesseract flags
+    backend: str = "auto"                 # see ocr_backends.BACKENDS
+    tile_size: int = 0                    # > 0: OCR larger pages in tiles of this size
+    tile_overlap: int = 256               # px shared by neighbouring tiles
+    tile_workers: int = 4                 # tiles OCRed concurrently (threads)
+
+    @property
+    def scale(self) -> float:
+        if not (self.target_dpi and self.source_dpi) or self.target_dpi >= self.source_dpi:
+            return 1.0
+        return self.target_dpi / self.source_dpi
+
+    @property
+    def tesseract_config(self) -> str:
+        if self.scale < 1:                # tell Tesseract the reduced resolution
+            return f"--dpi {self.target_dpi} {self.config}".strip()
+        return self.config
+
+    @property
+    def untiled(self) -> "OcrConfig":
+        return replace(self, tile_size=0)
+
+    def tiled(self, img) -> bool:
+        return self.tile_size > 0 and max(img.shape[:2]) > self.tile_size
+
+    def key(self) -> str:
+        return (f"{self.lang}|{self.tesseract_config}|s={self.scale:.4f}|"
+                f"g={self.grayscale}|b={self.binarize}/{self.block_size}")
+
+def prepare(img, cfg: OcrConfig) -> Tuple[np.ndarray, float]:
+    """Return the image Tesseract should see and its scale vs `img`."""
+    out, s = img, cfg.scale
+    if (cfg.grayscale or cfg.binarize) and out.ndim == 3:
+        out = cv2.cvtColor(out, cv2.COLOR_BGR2GRAY)
+    if s < 1:
+        out = cv2.resize(out, None, fx=s, fy=s, interpolation=cv2.INTER_AREA)
+    if cfg.binarize:
+        block = max(3, int(cfg.block_size * max(s, 0.1)) | 1)
+        out = cv2.adaptiveThreshold(out, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                                    cv2.THRESH_BINARY, block, 15)
+    return out, s
+
+def scale_boxes(data: Dict[str, List], s: float) -> Dict[str, List]:
+    """Map box columns from OCR resolution back to page resolution."""
+    if s == 1.0 or not data.get("left"):
+        return data
+    x1 = np.asarray(data["left"]) / s;  y1 = np.asarray(data["top"]) / s
+    x2 = x1 + np.asarray(data["width"]) / s
+    y2 = y1 + np.asarray(data["height"]) / s
+    x1, y1 = np.floor(x1).astype(int), np.floor(y1).astype(int)
+    x2, y2 = np.ceil(x2).astype(int),  np.ceil(y2).astype(int)
+    out = dict(data)
+    out["left"], out["top"] = x1.tolist(), y1.tolist()
+    out["width"], out["height"] = (x2 - x1).tolist(), (y2 - y1).tolist()
+    return out
+
+__all__ = ["OcrConfig", "prepare", "scale_boxes"]
@@ -0,0 +1,237 @@
+"""
+output_sinks.py
+---------------
+Where redacted pages go.  Each sink pairs a picklable codec (encodes one
+page; runs in pool workers) with a writer that receives encoded pages in
+page order in the parent process.
+
+  ImageDirSink : one output_page_N.<ext> file per page (legacy layout)
+  PdfSink      : single multi-page PDF, streamed to disk page by page -
+                 only the current page is ever held in memory.
+  TiffSink     : single multi-page TIFF (Deflate), appended frame by frame.
+"""
+
+import os, zlib
+import cv2, numpy as np
+from PIL import TiffImagePlugin
+from dataclasses import dataclass
+from typing import List, NamedTuple, Tuple, Union
+
+ENCODINGS = ("jpeg", "png", "lossless")     # "lossless" == "png"
+STRIP_ROWS = 1024                            # lossless PDF pages compress in strips
+TIFF_DEFLATE = 8                             # libtiff COMPRESSION_ADOBE_DEFLATE
+
+@dataclass(frozen=True)
+class OutputEncoding:
+    format: str = "jpeg"
+    jpeg_quality: int = 95                  # cv2.imwrite default
+    png_compression: int = 3                # 0-9 (zlib level)
+
+    def __post_init__(self):
+        if self.format not in ENCODINGS:
+            raise ValueError(f"Unknown encoding {self.format!r}")
+
+    @property
+    def lossy(self) -> bool:
+        return self.format == "jpeg"
+
+Dpi = Union[float, Tuple[float, float]]     # one value, or (x, y) for faxes
+
+def _dpi_xy(dpi: Dpi) -> Tuple[float, float]:
+    return tuple(dpi) if isinstance(dpi, (tuple, list)) else (dpi, dpi)
+
+class EncodedPage(NamedTuple):
+    width: int
+    height: int
+    channels: int
+    data: bytes
+
+def _imencode(img, encoding: OutputEncoding) -> bytes:
+    if encoding.lossy:
+        ok, buf = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, encoding.jpeg_quality])
+    else:
+        ok, buf = cv2.imencode(".png", img, [cv2.IMWRITE_PNG_COMPRESSION, encoding.png_compression])
+    if not ok:
+        raise RuntimeError("Image encoding failed")
+    return buf.tobytes()
+
+# ------------------------------------------------------------------ #
+# Codecs (worker side)                                               #
+# ------------------------------------------------------------------ #
+class ImageFileCodec:
+    def __init__(self, encoding: OutputEncoding):
+        self.encoding = encoding
+
+    def encode(self, img) -> EncodedPage:
+        h, w = img.shape[:2]
+        return EncodedPage(w, h, 1 if img.ndim == 2 else 3, _imencode(img, self.encoding))
+
+class PdfPageCodec(ImageFileCodec):
+    """JPEG pages embed as-is (DCTDecode); lossless pages as raw Flate."""
+    def encode(self, img) -> EncodedPage:
+        if self.encoding.lossy:
+            return super().encode(img)
+        h, w = img.shape[:2]
+        z, parts = zlib.compressobj(self.encoding.png_compression), []
+        for y in range(0, h, STRIP_ROWS):        # strips: no full-page RGB copy
+            strip = img[y:y+STRIP_ROWS]
+            if img.ndim == 3:
+                strip = cv2.cvtColor(strip, cv2.COLOR_BGR2RGB)
+            parts.append(z.compress(np.ascontiguousarray(strip).data))
+        parts.append(z.flush())
+        return EncodedPage(w, h, 1 if img.ndim == 2 else 3, b"".join(parts))
+
+class TiffPageCodec:
+    """
+    Single-frame Deflate TIFFs (JPEG-in-TIFF is not reliable in OpenCV),
+    tagged with their resolution in dots per inch.
+    """
+    def __init__(self, encoding: OutputEncoding, dpi: Dpi = 300):
+        self.encoding = encoding
+        self.dpi = _dpi_xy(dpi)
+
+    def encode(self, img) -> EncodedPage:
+        h, w = img.shape[:2]
+        xdpi, ydpi = self.dpi
+        ok, buf = cv2.imencode(".tiff", img, [cv2.IMWRITE_TIFF_COMPRESSION, TIFF_DEFLATE,
+                                              cv2.IMWRITE_TIFF_RESUNIT, 2,    # inch
+                                              cv2.IMWRITE_TIFF_XDPI, round(xdpi),
+                                              cv2.IMWRITE_TIFF_YDPI, round(ydpi)])
+        if not ok:
+            raise RuntimeError("TIFF encoding failed")
+        return EncodedPage(w, h, 1 if img.ndim == 2 else 3, buf.tobytes())
+
+# ------------------------------------------------------------------ #
+# Writers (parent side)                                              #
+# ------------------------------------------------------------------ #
+class ImageDirSink:
+    """
+    One output_page_N file per page.  Pages are written as `<name>.part`
+    and renamed on close(), so an aborted job leaves no partial set behind
+    (and does not overwrite the pages of an earlier run).
+    """
+    def __init__(self, output_dir: str = "", encoding: OutputEncoding = OutputEncoding()):
+        self.output_dir = output_dir
+        self.codec = ImageFileCodec(encoding)
+        self.ext = ".jpg" if encoding.lossy else ".png"
+        self.paths: List[str] = []
+
+    def write(self, page_no: int, page: EncodedPage) -> None:
+        path = os.path.join(self.output_dir, f"output_page_{page_no}{self.ext}")
+        with open(path + ".part", "wb") as f:
+            f.write(page.data)
+        self.paths.append(path)
+
+    def close(self) -> List[str]:
+        for path in self.paths:
+            os.replace(path + ".part", path)
+        return self.paths
+
+    def abort(self) -> None:
+        for path in self.paths:
+            if os.path.exists(path + ".part"):
+                os.remove(path + ".part")
+        self.paths.clear()
+
+class PdfSink:
+    """
+    Minimal streaming PDF writer: one full-page image per page.  Objects
+    are appended as pages arrive; the page tree and xref are written on
+    close().  Output goes to `<path>.part` and is renamed when complete.
+    Page size is pixels / `dpi` (one value or an (x, y) pair) inches.
+    """
+    def __init__(self, path: str, encoding: OutputEncoding = OutputEncoding(),
+                 dpi: Dpi = 300):
+        self.path  = path
+        self.codec = PdfPageCodec(encoding)
+        self.dpi   = _dpi_xy(dpi)
+        self._tmp  = path + ".part"
+        self._f    = open(self._tmp, "wb")
+        self._offsets = {}
+        self._kids: List[int] = []
+        self._next_id = 3                     # 1 = catalog, 2 = page tree
+        self._f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._obj(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+
+    def _obj(self, num: int, body: bytes, stream: bytes = None) -> None:
+        self._offsets[num] = self._f.tell()
+        self._f.write(b"%d 0 obj\n" % num + body)
+        if stream is not None:
+            self._f.write(b"\nstream\n"); self._f.write(stream); self._f.write(b"\nendstream")
+        self._f.write(b"\nendobj\n")
+
+    def write(self, page_no: int, page: EncodedPage) -> None:
+        img_id, content_id, page_id = range(self._next_id, self._next_id + 3)
+        self._next_id += 3
+        pw, ph = page.width * 72 / self.dpi[0], page.height * 72 / self.dpi[1]
+
+        colorspace = b"/DeviceGray" if page.channels == 1 else b"/DeviceRGB"
+        filt = b"/DCTDecode" if self.codec.encoding.lossy else b"/FlateDecode"
+        self._obj(img_id, b"<< /Type /XObject /Subtype /Image /Width %d /Height %d "
+                          b"/ColorSpace %s /BitsPerComponent 8 /Filter %s /Length %d >>"
+                  % (page.width, page.height, colorspace, filt, len(page.data)), page.data)
+        content = b"q %.4f 0 0 %.4f 0 0 cm /Im0 Do Q" % (pw, ph)
+        self._obj(content_id, b"<< /Length %d >>" % len(content), content)
+        self._obj(page_id, b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %.4f %.4f] "
+                           b"/Resources << /XObject << /Im0 %d 0 R >> >> /Contents %d 0 R >>"
+                  % (pw, ph, img_id, content_id))
+        self._kids.append(page_id)
+
+    def close(self) -> List[str]:
+        kids = b" ".join(b"%d 0 R" % k for k in self._kids)
+        self._obj(2, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(self._kids)))
+        xref = self._f.tell()
+        n = self._next_id
+        self._f.write(b"xref\n0 %d\n0000000000 65535 f \n" % n)
+        for num in range(1, n):
+            self._f.write(b"%010d 00000 n \n" % self._offsets[num])
+        self._f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (n, xref))
+        self._f.close()
+        os.replace(self._tmp, self.path)
+        return [self.path]
+
+    def abort(self) -> None:
+        self._f.close()
+        if os.path.exists(self._tmp):
+            os.remove(self._tmp)
+
+class TiffSink:
+    """
+    Multi-page TIFF written incrementally: each encoded frame is appended
+    to `<path>.part` (PIL's AppendingTiffWriter re-links the IFD chain) and
+    the file is renamed on close(), so memory stays at one frame.  `dpi`
+    may be an (x, y) pair - fax TIFFs are typically 204 x 196 or 204 x 98.
+    """
+    def __init__(self, path: str, encoding: OutputEncoding = OutputEncoding(),
+                 dpi: Dpi = 300):
+        self.path  = path
+        self.codec = TiffPageCodec(encoding, dpi)
+        self.dpi   = self.codec.dpi
+        self._tmp  = path + ".part"
+        self._tf   = TiffImagePlugin.AppendingTiffWriter(self._tmp, True)
+
+    def write(self, page_no: int, page: EncodedPage) -> None:
+        self._tf.write(page.data)
+        self._tf.newFrame()
+
+    def close(self) -> List[str]:
+        self._tf.close()
+        os.replace(self._tmp, self.path)
+        return [self.path]
+
+    def abort(self) -> None:
+        self._tf.close()
+        if os.path.exists(self._tmp):
+            os.remove(self._tmp)
+
+def output_path(file_path: str, output_dir: str = "", ext: str = ".pdf",
+                suffix: str = "_redacted") -> str:
+    """<output_dir or input dir>/<input stem><suffix><ext>"""
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    return os.path.join(output_dir or os.path.dirname(file_path), stem + suffix + ext)
+
+def pdf_output_path(file_path: str, output_dir: str = "") -> str:
+    return output_path(file_path, output_dir, ".pdf")
+
+__all__ = ["OutputEncoding", "ImageDirSink", "PdfSink", "TiffSink",
+           "output_path", "pdf_output_path", "ENCODINGS"]
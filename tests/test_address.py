@@ -0,0 +1,49 @@
+import numpy as np
+
+from Blurkey import detect_and_blur_address_entities
+
+def _data(words):
+    """image_to_data-style dict from (block, line, x, y, w, h, text) rows."""
+    cols = {k: [] for k in ("level", "block_num", "par_num", "line_num", "word_num",
+                            "left", "top", "width", "height", "conf", "text")}
+    for n, (block, line, x, y, w, h, text) in enumerate(words, 1):
+        for k, v in zip(cols, (5, block, 1, line, n, x, y, w, h, 90, text)):
+            cols[k].append(v)
+    return cols
+
+def _masked_rows(img):
+    return np.flatnonzero((img == 0).all(axis=2).any(axis=1))
+
+def test_lines_below_stay_in_the_keyword_column():
+    # address in the left column, an unrelated block 5 px lower on the right
+    words = [(1, i + 1, 50, 40 + 50 * i, 250, 30, "Address:" if i == 0 else f"a{i}")
+             for i in range(5)]
+    words += [(2, i + 1, 400, 45 + 50 * i, 300, 30, f"b{i}") for i in range(5)]
+    img = np.full((400, 800, 3), 255, np.uint8)
+    detect_and_blur_address_entities(img, ["address:"], mode="fill",
+                                     data=_data(words))
+    rows = _masked_rows(img)
+    assert rows.min() <= 40 and rows.max() >= 270          # all five lines
+    cols = np.flatnonzero((img == 0).all(axis=2).any(axis=0))
+    assert cols.max() < 400                                # not the other column
+
+def test_value_beside_a_form_label_is_masked():
+    # "Address:" label in its own block, the value lines in a block to its right
+    words = [(1, 1, 50, 40, 150, 30, "Address:")]
+    words += [(2, i + 1, 400, 40 + 50 * i, 300, 30, f"v{i}") for i in range(5)]
+    img = np.full((400, 800, 3), 255, np.uint8)
+    detect_and_blur_address_entities(img, ["address:"], mode="fill",
+                                     data=_data(words))
+    rows = _masked_rows(img)
+    cols = np.flatnonzero((img == 0).all(axis=2).any(axis=0))
+    assert rows.min() <= 40 and rows.max() >= 270          # all five value lines
+    assert cols.min() <= 50 and cols.max() >= 700
+
+def test_lines_below_are_counted_per_hit():
+    words = [(1, i + 1, 50, 40 + 50 * i, 250, 30, "Address:" if i == 0 else f"a{i}")
+             for i in range(8)]
+    img = np.full((500, 400, 3), 255, np.uint8)
+    detect_and_blur_address_entities(img, ["address:"], mode="fill", lines_below=2,
+                                     data=_data(words))
+    rows = _masked_rows(img)
+    assert rows.max() < 40 + 50 * 3
@@ -0,0 +1,66 @@
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+import batch
+from Blurkey import _ocr_cache_key
+from batch import OutputCollision, expand_inputs, run_batch
+from ocr_cache import OcrCache
+from ocr_prep import OcrConfig, prepare
+
+def _touch(root, *rels):
+    for rel in rels:
+        path = os.path.join(root, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        open(path, "wb").close()
+
+def test_output_root_inside_an_input_dir_is_skipped(tmp_path):
+    docs = str(tmp_path / "docs")
+    _touch(docs, "a.png", "sub/b.pdf", "redacted/a/output_page_1.png", "notes.txt")
+    rels = [rel for _, rel in expand_inputs([docs], exclude=os.path.join(docs, "redacted"))]
+    assert rels == ["a.png", os.path.join("sub", "b.pdf")]
+
+def test_output_root_inside_a_glob_is_skipped(tmp_path):
+    docs = str(tmp_path / "docs")
+    _touch(docs, "a.png", "redacted/a/output_page_1.png")
+    found = expand_inputs([os.path.join(docs, "**", "*.png")],
+                          exclude=os.path.join(docs, "redacted"))
+    assert [rel for _, rel in found] == ["a.png"]
+
+def test_output_root_above_the_input_excludes_nothing(tmp_path):
+    docs = str(tmp_path / "docs")
+    _touch(docs, "a.png", "sub/b.png")
+    assert len(expand_inputs([docs], exclude=str(tmp_path))) == 2
+    assert len(expand_inputs([docs], exclude=docs)) == 2
+
+def test_same_stem_different_extension_get_own_folders(tmp_path):
+    docs = str(tmp_path / "docs")
+    _touch(docs, "a.pdf", "a.png")
+    assert [rel for _, rel in expand_inputs([docs])] == ["a.pdf", "a.png"]
+
+def test_inputs_sharing_an_output_folder_are_rejected(tmp_path):
+    _touch(str(tmp_path), "x/r.png", "y/r.png")
+    with pytest.raises(OutputCollision):
+        expand_inputs([str(tmp_path / "x" / "r.png"), str(tmp_path / "y" / "r.png")])
+    assert len(expand_inputs([str(tmp_path)])) == 2    # via the parent: x/r.png, y/r.png
+
+def test_one_pool_serves_the_whole_batch(tmp_path, monkeypatch):
+    ocr, cache = OcrConfig(source_dpi=300), OcrCache(str(tmp_path / "cache"))
+    words = {"level": [5], "page_num": [1], "block_num": [1], "par_num": [1],
+             "line_num": [1], "word_num": [1], "left": [10], "top": [10],
+             "width": [40], "height": [12], "conf": [95], "text": ["secret"]}
+    docs = tmp_path / "docs"; docs.mkdir()
+    for i in range(3):                           # OCR is served from the cache
+        img = np.full((60, 80 + i, 3), 255, np.uint8)
+        cv2.imwrite(str(docs / f"p{i}.png"), img)
+        cache.put(_ocr_cache_key(prepare(img, ocr)[0], ocr), words)
+    real, pools = batch.page_pool, []
+    monkeypatch.setattr(batch, "page_pool", lambda *a: pools.append(real(*a)) or pools[-1])
+    stats = run_batch([str(docs)], ["secret"], str(tmp_path / "out"), workers=2,
+                      mask_mode="fill", ocr_cache=cache, ocr=ocr,
+                      output_format="images", verbose=False)
+    assert (stats.files_done, stats.files_failed, len(pools)) == (3, 0, 1)
+    out = cv2.imread(str(tmp_path / "out" / "p0.png" / "output_page_1.jpg"))
+    assert out[15, 20].max() < 40                # the word was masked
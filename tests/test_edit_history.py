@@ -0,0 +1,52 @@
+import numpy as np
+
+from edit_history import EditHistory
+
+def _paint(history, img, x1, value):
+    with history.edit(img, x1, 0, x1 + 10, 10):
+        img[0:10, x1:x1 + 10] = value
+
+def test_undo_redo_round_trip():
+    img = np.zeros((10, 40), np.uint8)
+    h = EditHistory()
+    _paint(h, img, 0, 1); _paint(h, img, 10, 2)
+    assert h.undo(img) == (10, 0, 20, 10) and img[0, 10] == 0 and img[0, 0] == 1
+    assert h.redo(img) == (10, 0, 20, 10) and img[0, 10] == 2
+    assert h.undo_all(img) == (0, 0, 20, 10) and not img.any()
+    assert h.undo(img) is None and not h.truncated
+
+def test_byte_cap_evicts_oldest_steps_first():
+    img = np.zeros((10, 50), np.uint8)
+    h = EditHistory(max_bytes=250)                  # 100 bytes per step
+    for i in range(4):
+        _paint(h, img, 10 * i, i + 1)
+    assert h.truncated and h.nbytes == 200
+    h.undo_all(img)
+    assert list(img[0, ::10]) == [1, 2, 0, 0, 0]    # steps 1-2 can't be undone
+
+def test_cap_keeps_the_latest_step():
+    img = np.zeros((10, 10), np.uint8)
+    h = EditHistory(max_bytes=10)
+    _paint(h, img, 0, 7)
+    assert h.can_undo() and not h.truncated
+    _paint(h, img, 0, 9)
+    assert h.truncated and h.nbytes == 100
+    h.undo(img)
+    assert img[0, 0] == 7 and not h.can_undo()
+
+def test_new_edit_clears_redo():
+    img = np.zeros((10, 30), np.uint8)
+    h = EditHistory()
+    _paint(h, img, 0, 1); _paint(h, img, 10, 2)
+    h.undo(img)
+    _paint(h, img, 20, 3)
+    assert not h.can_redo() and h.nbytes == 200
+
+def test_edit_is_clipped_to_the_image():
+    img = np.zeros((10, 10), np.uint8)
+    h = EditHistory()
+    with h.edit(img, -5, -5, 5, 5) as rect:
+        assert rect == (0, 0, 5, 5)
+    with h.edit(img, 20, 20, 30, 30):
+        pass
+    assert h.nbytes == 25                           # empty rect not recorded
@@ -0,0 +1,26 @@
+from keyword_matcher import KeywordMatcher, as_matcher, normalize_tokens
+
+def spans(keywords, text):
+    return KeywordMatcher(keywords).find(normalize_tokens(text.split(" ")))
+
+def test_longest_keyword_at_a_token_wins():
+    assert spans(["john", "john smith"], "dear john smith hi") == [(1, 3)]
+
+def test_nested_matches_are_dropped():
+    assert spans(["john smith jr", "smith", "smith jr"], "john smith jr") == [(0, 3)]
+
+def test_overlapping_matches_are_kept():
+    assert spans(["a b", "b c"], "a b c") == [(0, 2), (1, 3)]
+
+def test_matching_is_case_and_whitespace_insensitive():
+    assert spans(["John  SMITH"], "JOHN Smith") == [(0, 2)]
+
+def test_phrases_do_not_span_empty_tokens():
+    m = KeywordMatcher(["john smith"])
+    assert m.find(normalize_tokens(["John", "", "Smith"])) == []
+
+def test_repeated_and_blank_keywords():
+    m = KeywordMatcher(["iban", "IBAN", "  ", "iban"])
+    assert len(m) == 1
+    assert m.find(["iban", "x", "iban"]) == [(0, 1), (2, 3)]
+    assert as_matcher(m) is m
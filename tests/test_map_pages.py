@@ -0,0 +1,28 @@
+import threading
+
+import pytest
+
+from Blurkey import map_pages
+
+def _job(file_path, page_no, factor):
+    if page_no == 3:
+        raise RuntimeError("bad page")
+    return f"{file_path}:{page_no * factor}"
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_results_in_page_order_with_errors(workers):
+    out = list(map_pages(_job, "doc", [1, 2, 3, 4, 5], 10, workers=workers))
+    assert [p for p, _, _ in out] == [1, 2, 3, 4, 5]
+    assert [r for _, r, _ in out] == ["doc:10", "doc:20", None, "doc:40", "doc:50"]
+    assert isinstance(out[2][2], RuntimeError) and out[0][2] is None
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_cancel_stops_at_a_page_boundary(workers):
+    cancel = threading.Event()
+    seen = []
+    for p, _, _ in map_pages(_job, "doc", list(range(1, 50)), 1,
+                             workers=workers, cancel=cancel):
+        seen.append(p)
+        if p == 2:
+            cancel.set()
+    assert seen == [1, 2]
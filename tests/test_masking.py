@@ -0,0 +1,21 @@
+import numpy as np
+import pytest
+
+from masking import mask_boxes, merge_boxes
+
+def test_overlapping_and_touching_boxes_merge():
+    assert merge_boxes([(0, 0, 10, 10), (5, 5, 20, 20)]) == [(0, 0, 20, 20)]
+    assert merge_boxes([(0, 0, 10, 10), (12, 0, 20, 10)]) == [(0, 0, 20, 10)]
+    assert len(merge_boxes([(0, 0, 10, 10), (13, 0, 20, 10)])) == 2
+
+def test_merging_is_transitive():
+    # the third box only touches the union of the first two
+    boxes = [(0, 0, 10, 10), (30, 0, 40, 10), (9, 5, 31, 8)]
+    assert merge_boxes(boxes) == [(0, 0, 40, 10)]
+
+def test_mask_boxes_fill_and_unknown_mode():
+    img = np.full((20, 20, 3), 255, np.uint8)
+    assert mask_boxes(img, [(-5, -5, 5, 5)], mode="fill") == [(0, 0, 5, 5)]
+    assert not img[:5, :5].any() and img[5:, 5:].all()
+    with pytest.raises(ValueError):
+        mask_boxes(img, [], mode="smudge")
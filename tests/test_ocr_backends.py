@@ -0,0 +1,35 @@
+import types
+
+import numpy as np
+import pytest
+
+import ocr_backends
+from Blurkey import _ocr_cache_key
+from ocr_backends import TesserocrBackend, backend_name
+from ocr_prep import OcrConfig
+
+@pytest.fixture
+def fake_tesserocr(monkeypatch):
+    fake = types.SimpleNamespace(PSM=types.SimpleNamespace(AUTO=3))
+    monkeypatch.setattr(ocr_backends, "tesserocr", fake)
+    return fake
+
+def test_tesserocr_config_flags(fake_tesserocr):
+    kwargs, variables = TesserocrBackend._parse_config(
+        "--psm 6 --oem 1 --dpi 150 -c preserve_interword_spaces=1")
+    assert kwargs == {"psm": 6, "oem": 1}
+    assert variables == {"user_defined_dpi": "150", "preserve_interword_spaces": "1"}
+
+@pytest.mark.parametrize("config", ["-l deu", "--psm", "-c novalue", "--user-words w.txt"])
+def test_tesserocr_rejects_unsupported_flags(fake_tesserocr, config):
+    with pytest.raises(ValueError):
+        TesserocrBackend._parse_config(config)
+
+def test_cache_key_depends_on_backend(monkeypatch, fake_tesserocr):
+    img = np.zeros((8, 8), np.uint8)
+    assert backend_name("auto") == "tesserocr"
+    auto = _ocr_cache_key(img, OcrConfig())
+    assert auto == _ocr_cache_key(img, OcrConfig(backend="tesserocr"))
+    assert auto != _ocr_cache_key(img, OcrConfig(backend="pytesseract"))
+    monkeypatch.setattr(ocr_backends, "tesserocr", None)
+    assert _ocr_cache_key(img, OcrConfig()) != auto
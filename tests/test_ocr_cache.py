@@ -0,0 +1,57 @@
+import os
+import time
+
+import numpy as np
+
+from ocr_cache import OcrCache, cache_key
+
+DATA = {"left": [1, 20], "top": [2, 2], "width": [10, 12], "height": [8, 8],
+        "conf": [91, 88], "text": ["John", "Smith"]}
+
+def test_round_trip(tmp_path):
+    cache = OcrCache(str(tmp_path))
+    assert cache.get("missing") is None
+    cache.put("k", DATA)
+    assert cache.get("k") == DATA
+
+def test_key_depends_on_pixels_and_settings():
+    img = np.zeros((4, 4), np.uint8)
+    other = img.copy(); other[0, 0] = 1
+    assert cache_key(img, "a") == cache_key(img.copy(), "a")
+    assert cache_key(img, "a") != cache_key(img, "b")
+    assert cache_key(img, "a") != cache_key(other, "a")
+
+def test_least_recently_read_entries_are_evicted(tmp_path):
+    cache = OcrCache(str(tmp_path), max_bytes=10**9)
+    for i, k in enumerate("abc"):
+        cache.put(k, DATA)
+        os.utime(cache._path(k), (time.time() - 100 + i,) * 2)
+    cache.get("a")                                   # a is now the newest
+    size = os.path.getsize(cache._path("a"))
+    cache.max_bytes = 2 * size
+    cache.evict()
+    assert cache.get("b") is None
+    assert cache.get("a") == DATA and cache.get("c") == DATA
+
+def test_put_scans_the_directory_once(tmp_path, monkeypatch):
+    import ocr_cache
+    scans = []
+    real = os.scandir
+    monkeypatch.setattr(ocr_cache.os, "scandir", lambda p: scans.append(p) or real(p))
+    cache = OcrCache(str(tmp_path))
+    for i in range(20):
+        cache.put(f"k{i}", DATA)
+    assert len(scans) == 1
+
+def test_crossing_the_cap_evicts_below_the_high_water_mark(tmp_path):
+    cache = OcrCache(str(tmp_path))
+    cache.put("probe", DATA)
+    size = os.path.getsize(cache._path("probe"))
+    cache.clear()
+    assert os.listdir(tmp_path) == []
+    cache.max_bytes = 10 * size
+    for i in range(11):
+        cache.put(f"k{i}", DATA)
+        os.utime(cache._path(f"k{i}"), (time.time() - 100 + i,) * 2)
+    left = sorted(os.listdir(tmp_path))
+    assert len(left) == 9 and "k0.npz" not in left and "k1.npz" not in left
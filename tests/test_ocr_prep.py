@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+from PIL import Image
+
+from Blurkey import source_dpi
+from ocr_prep import OcrConfig, prepare
+
+def test_unknown_source_dpi_is_never_downscaled():
+    cfg = OcrConfig(target_dpi=150)
+    assert cfg.scale == 1.0 and "--dpi" not in cfg.tesseract_config
+    img = np.zeros((300, 200, 3), np.uint8)
+    assert prepare(img, cfg)[0].shape == img.shape
+
+def test_known_source_dpi_is_downscaled():
+    cfg = OcrConfig(source_dpi=300, target_dpi=150)
+    assert cfg.scale == 0.5 and cfg.tesseract_config == "--dpi 150"
+    assert OcrConfig(source_dpi=150, target_dpi=200).scale == 1.0
+
+def test_source_dpi_comes_from_the_file(tmp_path):
+    tagged, plain = str(tmp_path / "tagged.png"), str(tmp_path / "plain.png")
+    Image.new("RGB", (8, 8)).save(tagged, dpi=(200, 200))
+    Image.new("RGB", (8, 8)).save(plain)
+    assert source_dpi(tagged) == 200
+    assert source_dpi(plain) is None
+    assert source_dpi("scan.pdf", 150) == 150
+
+def test_source_dpi_of_a_decompression_bomb_sized_image(tmp_path, monkeypatch):
+    path = str(tmp_path / "poster.png")
+    Image.new("RGB", (60, 60)).save(path, dpi=(600, 600))
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 100)   # 3600 px > 2x the limit
+    with pytest.raises(Image.DecompressionBombError):
+        Image.open(path)
+    assert source_dpi(path) == 600
+    assert Image.MAX_IMAGE_PIXELS == 100
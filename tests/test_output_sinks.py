@@ -0,0 +1,47 @@
+import os
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from Blurkey import make_sink, source_resolution
+from output_sinks import ImageDirSink, OutputEncoding
+
+def _write_pages(sink, n=2):
+    img = np.zeros((20, 30, 3), np.uint8)
+    for page_no in range(1, n + 1):
+        sink.write(page_no, sink.codec.encode(img))
+
+def test_image_dir_sink_abort_leaves_nothing(tmp_path):
+    sink = ImageDirSink(str(tmp_path))
+    _write_pages(sink)
+    sink.abort()
+    assert os.listdir(tmp_path) == []
+
+def test_image_dir_sink_close_publishes_pages(tmp_path):
+    sink = ImageDirSink(str(tmp_path))
+    _write_pages(sink)
+    paths = sink.close()
+    assert sorted(os.listdir(tmp_path)) == ["output_page_1.jpg", "output_page_2.jpg"]
+    assert all(os.path.getsize(p) for p in paths)
+
+def test_tiff_sink_writes_fax_resolution(tmp_path):
+    src = str(tmp_path / "fax.tif")
+    Image.new("L", (40, 20), 255).save(src, dpi=(204, 196))
+    sink = make_sink(src, str(tmp_path), "tiff", OutputEncoding("png"))
+    _write_pages(sink)
+    out, = sink.close()
+    with Image.open(out) as im:
+        assert im.n_frames == 2
+        assert tuple(round(v) for v in im.info["dpi"]) == (204, 196)
+    assert source_resolution(out) == (204, 196)
+
+@pytest.mark.parametrize("tag, size", [((200, 200), b"10.8000 7.2000"), (None, b"7.2000 4.8000")])
+def test_pdf_page_size_follows_source_dpi(tmp_path, tag, size):
+    src = str(tmp_path / "scan.png")
+    Image.new("RGB", (30, 20), "white").save(src, **({"dpi": tag} if tag else {}))
+    sink = make_sink(src, str(tmp_path), "pdf", OutputEncoding("png"))
+    _write_pages(sink, 1)
+    out, = sink.close()
+    with open(out, "rb") as f:
+        assert b"/MediaBox [0 0 %s]" % size in f.read()
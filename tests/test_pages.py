@@ -0,0 +1,24 @@
+from PIL import Image
+
+from Blurkey import iter_pages, wanted_pages
+
+def _tiff(path, frames):
+    imgs = [Image.new("RGB", (16, 12), (i * 40, 0, 0)) for i in range(frames)]
+    imgs[0].save(path, save_all=True, append_images=imgs[1:])
+    return path
+
+def test_none_means_all_pages(tmp_path):
+    path = _tiff(str(tmp_path / "fax.tif"), 3)
+    assert wanted_pages(path) == [1, 2, 3]
+    assert [p for p, _ in iter_pages(path)] == [1, 2, 3]
+
+def test_empty_selection_means_no_pages(tmp_path):
+    tif = _tiff(str(tmp_path / "fax.tif"), 3)
+    png = str(tmp_path / "page.png"); Image.new("RGB", (16, 12)).save(png)
+    assert wanted_pages(tif, []) == []
+    assert list(iter_pages(tif, [])) == [] and list(iter_pages(png, [])) == []
+
+def test_selection_is_sorted_and_clipped(tmp_path):
+    path = _tiff(str(tmp_path / "fax.tif"), 3)
+    assert wanted_pages(path, [3, 0, 1, 3, 9]) == [1, 3]
+    assert [p for p, _ in iter_pages(path, [3, 1])] == [1, 3]
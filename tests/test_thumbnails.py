@@ -0,0 +1,17 @@
+import os
+import time
+
+from thumbnails import ThumbnailCache
+
+PNG = b"\x89PNG" + b"\0" * 996
+
+def test_cache_is_capped_least_recently_read_first(tmp_path):
+    cache = ThumbnailCache(str(tmp_path), max_bytes=int(3.5 * len(PNG)))
+    for p in (1, 2, 3):
+        cache.put("d", p, PNG)
+        os.utime(cache._path("d", p), (time.time() - 100 + p,) * 2)
+    assert cache.get("d", 1) == PNG                  # 1 is now the newest
+    cache.put("d", 4, PNG)
+    assert cache.get("d", 2) is None
+    assert all(cache.get("d", p) == PNG for p in (1, 3, 4))
+    assert len(os.listdir(tmp_path)) == 3
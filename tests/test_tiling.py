@@ -0,0 +1,46 @@
+import cv2
+import numpy as np
+import pytest
+
+from tiling import _dedupe, ocr_tiled, tile_grid
+
+def test_tile_grid_covers_the_page_with_overlap():
+    tiles = tile_grid(1000, 700, 400, 100)
+    cover = np.zeros((700, 1000), bool)
+    for x, y, w, h in tiles:
+        cover[y:y+h, x:x+w] = True
+    assert cover.all()
+    assert (300, 0, 400, 400) in tiles                # next start = tile - overlap
+    with pytest.raises(ValueError):
+        tile_grid(1000, 700, 100, 100)
+
+def test_dedupe_keeps_the_copy_farthest_from_an_edge():
+    near = (100, 100, 160, 120, 90, "near")
+    far  = (101, 100, 161, 120, 90, "far")
+    other = (170, 100, 230, 120, 90, "other")         # adjacent, not a duplicate
+    kept = _dedupe([(3, near), (50, far), (40, other)])
+    assert sorted(w[-1] for w in kept) == ["far", "other"]
+
+def _fake_ocr(crop):
+    """One "word" per connected blob; its text is the blob's gray level."""
+    gray = crop if crop.ndim == 2 else crop[:, :, 0]
+    data = {k: [] for k in ("level", "left", "top", "width", "height", "conf", "text")}
+    for v in np.unique(gray[gray > 0]):
+        n, _, stats, _ = cv2.connectedComponentsWithStats((gray == v).astype(np.uint8))
+        for x, y, w, h, _ in stats[1:]:
+            for k, val in zip(data, (5, x, y, w, h, 95, f"w{v}")):
+                data[k].append(int(val) if k != "text" else val)
+    return data
+
+def test_ocr_tiled_finds_every_word_once():
+    img = np.zeros((900, 1300), np.uint8)
+    words = {}
+    for i, (x, y) in enumerate([(20, 30), (380, 40), (395, 300), (780, 390),
+                                (1150, 820), (600, 610), (90, 780)]):
+        img[y:y+25, x:x+90] = 10 + i                  # some straddle tile seams
+        words[f"w{10 + i}"] = (x, y)
+    data = ocr_tiled(img, _fake_ocr, tile=400, overlap=120, workers=2)
+    found = {t: (l, tp) for t, l, tp, lvl in
+             zip(data["text"], data["left"], data["top"], data["level"]) if lvl == 5}
+    texts = [t for t, lvl in zip(data["text"], data["level"]) if lvl == 5]
+    assert found == words and len(texts) == len(words)
@@ -0,0 +1,81 @@
+"""
+text_layer.py
+-------------
+Word boxes straight from a PDF's text layer (poppler's pdftotext, which
+pdf2image already depends on), returned in pytesseract's image_to_data
+dict shape and scaled to raster pixel coordinates.  Born-digital pages
+skip OCR entirely; callers fall back to OCR when this returns None.
+
+Note: only real text is seen here - text baked into embedded images is
+not, so leave OCR on for documents that mix scans with generated text.
+"""
+
+import math, subprocess
+import xml.etree.ElementTree as ET
+from typing import Dict, List, Optional
+
+MIN_WORDS = 3            # fewer words than this = no usable text layer
+
+_COLS = ("level", "page_num", "block_num", "par_num", "line_num", "word_num",
+         "left", "top", "width", "height", "conf", "text")
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+def _run_pdftotext(file_path: str, page_no: int, timeout: int = 60) -> Optional[bytes]:
+    cmd = ["pdftotext", "-bbox-layout", "-f", str(page_no), "-l", str(page_no),
+           "-enc", "UTF-8", file_path, "-"]
+    try:
+        res = subprocess.run(cmd, capture_output=True, timeout=timeout, check=True)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return res.stdout
+
+def pdf_words(file_path: str, page_no: int, width_px: int, height_px: int
+              ) -> Optional[Dict[str, List]]:
+    """
+    Word boxes for one page (1-based) in image_to_data shape, scaled to a
+    `width_px` x `height_px` raster; None if the page has no usable text.
+    """
+    xml = _run_pdftotext(file_path, page_no)
+    if not xml:
+        return None
+    try:
+        root = ET.fromstring(xml)
+    except ET.ParseError:
+        return None
+    page = next((e for e in root.iter() if _local(e.tag) == "page"), None)
+    if page is None:
+        return None
+    sx = width_px  / float(page.get("width"))
+    sy = height_px / float(page.get("height"))
+
+    data = {c: [] for c in _COLS}
+    def add(level, block_no, line_no, word_no, el, text, conf):
+        x1 = math.floor(float(el.get("xMin")) * sx)
+        y1 = math.floor(float(el.get("yMin")) * sy)
+        x2 = math.ceil(float(el.get("xMax")) * sx)
+        y2 = math.ceil(float(el.get("yMax")) * sy)
+        for c, v in zip(_COLS, (level, page_no, block_no, 1, line_no, word_no,
+                                x1, y1, x2 - x1, y2 - y1, conf, text)):
+            data[c].append(v)
+
+    block_no = n_words = 0
+    for block in (e for e in page.iter() if _local(e.tag) == "block"):
+        block_no += 1
+        lines = [e for e in block if _local(e.tag) == "line"]
+        for line_no, line in enumerate(lines, 1):
+            # empty level-4 row per line, as Tesseract emits: phrases never
+            # match across a line break
+            add(4, block_no, line_no, 0, line, "", -1)
+            words = [e for e in line if _local(e.tag) == "word"]
+            for word_no, w in enumerate(words, 1):
+                text = (w.text or "").strip()
+                if text:
+                    add(5, block_no, line_no, word_no, w, text, 100)
+                    n_words += 1
+    if n_words < MIN_WORDS:
+        return None
+    return data
+
+__all__ = ["pdf_words"]
@@ -0,0 +1,95 @@
+"""
+thumbnails.py
+-------------
+Low-resolution page previews with a persistent on-disk cache (used by
+the GUI page gallery).  Entries are PNG files keyed by the SHA-1 of the
+document's bytes + page number + preview size, so a renamed copy reuses
+its previews and an edited file gets new ones.  Only missing pages are
+rendered - PDF pages straight at THUMB_DPI, never at full resolution.
+Total size is capped like the OCR cache (LRU, see disk_cache.py).
+"""
+
+import hashlib, os
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import cv2
+
+from Blurkey import iter_pages, wanted_pages
+from disk_cache import DiskCache
+
+DEFAULT_THUMB_DIR = os.path.join(os.path.expanduser("~"), ".cache", "blurkey", "thumbs")
+THUMB_DPI = 40               # A4 -> ~330 x 470 px before the final resize
+MAX_SIDE  = 180              # longest side of a preview, px
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+_hashes: Dict[Tuple[str, int, float], str] = {}    # (path, size, mtime) -> sha1
+
+def file_hash(path: str, chunk: int = 1 << 20) -> str:
+    """SHA-1 of the file contents (memoised per path / size / mtime)."""
+    st = os.stat(path)
+    memo = (os.path.abspath(path), st.st_size, st.st_mtime)
+    if memo not in _hashes:
+        h = hashlib.sha1()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(chunk), b""):
+                h.update(block)
+        _hashes[memo] = h.hexdigest()
+    return _hashes[memo]
+
+def make_thumbnail(img, max_side: int = MAX_SIDE):
+    h, w = img.shape[:2]
+    s = max_side / max(h, w)
+    if s >= 1:
+        return img
+    return cv2.resize(img, (max(1, round(w * s)), max(1, round(h * s))),
+                      interpolation=cv2.INTER_AREA)
+
+class ThumbnailCache(DiskCache):
+    def __init__(self, cache_dir: str = DEFAULT_THUMB_DIR, max_side: int = MAX_SIDE,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        super().__init__(cache_dir, max_bytes, ".png")
+        self.max_side = max_side
+
+    def _path(self, digest: str, page_no: int) -> str:
+        return os.path.join(self.cache_dir, f"{digest}_{page_no}_{self.max_side}.png")
+
+    def get(self, digest: str, page_no: int) -> Optional[bytes]:
+        path = self._path(digest, page_no)
+        try:
+            with open(path, "rb") as f:
+                png = f.read()
+        except OSError:
+            return None
+        self._touch(path)
+        return png
+
+    def put(self, digest: str, page_no: int, png: bytes) -> None:
+        self._store(self._path(digest, page_no), lambda f: f.write(png))
+
+    def iter_thumbnails(self, file_path: str, page_numbers: Optional[List[int]] = None,
+                        cancel=None) -> Iterator[Tuple[int, bytes]]:
+        """
+        Yield (page_no, PNG bytes): cached previews first, then the missing
+        pages as they are rendered.  Stops early once `cancel` is set.
+        """
+        digest = file_hash(file_path)
+        missing = []
+        for p in wanted_pages(file_path, page_numbers):
+            png = self.get(digest, p)
+            if png is None:
+                missing.append(p)
+            else:
+                yield p, png
+        if not missing:
+            return
+        for p, img in iter_pages(file_path, missing, dpi=THUMB_DPI, chunk=8):
+            if cancel is not None and cancel.is_set():
+                return
+            ok, buf = cv2.imencode(".png", make_thumbnail(img, self.max_side))
+            del img
+            png = buf.tobytes()
+            self.put(digest, p, png)
+            yield p, png
+
+__all__ = ["ThumbnailCache", "file_hash", "make_thumbnail",
+           "DEFAULT_THUMB_DIR", "THUMB_DPI", "MAX_SIDE"]
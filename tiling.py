@@ -0,0 +1,174 @@
+"""
+tiling.py
+---------
+Tiled OCR for very large single-page scans (A0 posters, engineering
+drawings at 600 DPI) that are slow or run out of memory as one image.
+
+  tile_grid    : overlapping tiles covering a page
+  ocr_tiled    : OCR the tiles on a thread pool (Tesseract runs out of
+                 process / without the GIL), drop the duplicate words of
+                 the overlaps and re-assemble lines in page coordinates
+
+Tesseract only ever holds one tile (plus its own working copies of it),
+which is where the memory of a whole-poster OCR run goes.  The page
+itself is still decoded, masked and encoded as one array: OpenCV and
+PIL have no region decoders for PNG / JPEG / compressed TIFF.
+
+Words cut by an inner tile edge are dropped (a neighbouring tile sees
+them whole); a word seen whole by several tiles is kept once, from the
+tile where it sits farthest from an edge.  Keep the overlap wider than
+the widest word.
+"""
+
+import threading, warnings
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+EDGE = 2                         # px: a word this close to an inner edge is cut
+CELL = 256                       # px: spatial hash cell for duplicate lookup
+
+_COLS = ("level", "page_num", "block_num", "par_num", "line_num", "word_num",
+         "left", "top", "width", "height", "conf", "text")
+
+Tile = Tuple[int, int, int, int]          # x, y, w, h
+
+def _starts(size: int, tile: int, overlap: int) -> List[int]:
+    return list(range(0, max(size - overlap, 1), tile - overlap))
+
+def tile_grid(width: int, height: int, tile: int, overlap: int) -> List[Tile]:
+    if not 0 <= overlap < tile:
+        raise ValueError("tile overlap must be smaller than the tile size")
+    return [(x, y, min(tile, width - x), min(tile, height - y))
+            for y in _starts(height, tile, overlap)
+            for x in _starts(width, tile, overlap)]
+
+def _whole_words(data, tile: Tile, width: int, height: int):
+    """
+    Level-5 words of one tile not cut by an inner tile edge, as page
+    coordinate tuples led by their distance to the nearest inner edge.
+    """
+    x0, y0, w, h = tile
+    levels = data.get("level") or [5] * len(data["text"])
+    words = []
+    for i, text in enumerate(data["text"]):
+        text = str(text).strip()
+        if levels[i] != 5 or not text:
+            continue
+        l, t = data["left"][i], data["top"][i]
+        r, b = l + data["width"][i], t + data["height"][i]
+        edges = ([l] if x0 > 0 else []) + ([t] if y0 > 0 else []) + \
+                ([w - r] if x0 + w < width else []) + ([h - b] if y0 + h < height else [])
+        if edges and min(edges) <= EDGE:
+            continue                                # cut by an inner edge
+        words.append((min(edges, default=np.inf),
+                      (x0 + l, y0 + t, x0 + r, y0 + b, data["conf"][i], text)))
+    return words
+
+def _dedupe(scored) -> List[tuple]:
+    """
+    Words seen by several tiles: keep the copy farthest from a tile edge
+    and drop any later box overlapping a kept one by more than half (IoU).
+    """
+    kept, grid = [], {}
+    for _, wd in sorted(scored, key=lambda s: -s[0]):
+        x1, y1, x2, y2 = wd[:4]
+        cells = [(cx, cy) for cy in range(y1 // CELL, y2 // CELL + 1)
+                          for cx in range(x1 // CELL, x2 // CELL + 1)]
+        dup = False
+        for k in {k for c in cells for k in grid.get(c, ())}:
+            a = kept[k]
+            iw = min(x2, a[2]) - max(x1, a[0]); ih = min(y2, a[3]) - max(y1, a[1])
+            if iw > 0 and ih > 0:
+                inter = iw * ih
+                union = (x2-x1)*(y2-y1) + (a[2]-a[0])*(a[3]-a[1]) - inter
+                if inter > 0.5 * union:
+                    dup = True; break
+        if not dup:
+            for c in cells:
+                grid.setdefault(c, []).append(len(kept))
+            kept.append(wd)
+    return kept
+
+def _lines(words) -> List[List[tuple]]:
+    """
+    Group words into lines left to right: a word continues a line when it
+    overlaps the line's last word vertically by half a word height and
+    starts within three word heights of it.
+    """
+    lines, open_, at = [], {}, []          # open_: y bucket -> line indices
+    hs = sorted(w[3] - w[1] for w in words)
+    bucket = max(1, hs[len(hs) // 2]) if hs else 1
+    for w in sorted(words, key=lambda w: (w[0], w[1])):
+        x1, y1, x2, y2 = w[:4]
+        h, best = y2 - y1, None
+        b = int((y1 + y2) / 2 // bucket)
+        for li in open_.get(b - 1, []) + open_.get(b, []) + open_.get(b + 1, []):
+            last = lines[li][-1]
+            v = min(y2, last[3]) - max(y1, last[1])
+            gap = x1 - last[2]
+            if v >= 0.5 * min(h, last[3] - last[1]) and -h <= gap <= 3 * max(h, 1):
+                if best is None or gap < best[0]:
+                    best = (gap, li)
+        if best is None:
+            lines.append([w]); at.append(b); li = len(lines) - 1
+        else:
+            li = best[1]; lines[li].append(w)
+            open_[at[li]].remove(li); at[li] = b
+        open_.setdefault(b, []).append(li)
+    return lines
+
+def ocr_tiled(img, ocr_fn: Callable[[np.ndarray], Dict[str, List]], tile: int,
+              overlap: int, workers: int = 4) -> Dict[str, List]:
+    """
+    Run `ocr_fn` (image -> image_to_data dict) over overlapping tiles of
+    `img` and stitch the results into one dict in page coordinates, with
+    one empty level-4 row per re-assembled line (phrases never match
+    across lines).
+    """
+    height, width = img.shape[:2]
+    tiles = tile_grid(width, height, tile, overlap)
+    crop = lambda t: ocr_fn(img[t[1]:t[1]+t[3], t[0]:t[0]+t[2]])
+    with ThreadPoolExecutor(max(1, workers)) as pool:
+        results = list(pool.map(crop, tiles))
+
+    scored = []
+    for t, data in zip(tiles, results):
+        scored += _whole_words(data, t, width, height)
+    words = _dedupe(scored)
+    lines = sorted(_lines(words), key=lambda ln: (min(w[1] for w in ln), ln[0][0]))
+
+    out = {c: [] for c in _COLS}
+    def add(*row):
+        for c, v in zip(_COLS, row):
+            out[c].append(v)
+    for n, line in enumerate(lines, 1):
+        x1, y1 = min(w[0] for w in line), min(w[1] for w in line)
+        x2, y2 = max(w[2] for w in line), max(w[3] for w in line)
+        add(4, 1, 1, 1, n, 0, x1, y1, x2 - x1, y2 - y1, -1, "")
+        for k, (l, t, r, b, conf, text) in enumerate(line, 1):
+            add(5, 1, 1, 1, n, k, l, t, r - l, b - t, conf, text)
+    return out
+
+_bomb_lock = threading.Lock()
+
+def image_header(path: str) -> Optional[Tuple[int, int, Dict[str, Any]]]:
+    """
+    (width, height, info) from the file header, or None if unreadable.
+    Nothing is decoded, so PIL's decompression-bomb limit is lifted for
+    the read - huge posters are exactly the pages we need to size up.
+    """
+    with _bomb_lock, warnings.catch_warnings():
+        warnings.simplefilter("ignore", Image.DecompressionBombWarning)
+        limit, Image.MAX_IMAGE_PIXELS = Image.MAX_IMAGE_PIXELS, None
+        try:
+            with Image.open(path) as im:
+                return im.width, im.height, dict(im.info)
+        except OSError:
+            return None
+        finally:
+            Image.MAX_IMAGE_PIXELS = limit
+
+__all__ = ["tile_grid", "ocr_tiled", "image_header"]